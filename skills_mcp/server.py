@@ -20,9 +20,11 @@ Server-level documentation:
 Environment (optional):
 - SKILLS_GIT_URL: git URL (e.g., https://github.com/yourorg/skills-repo.git)
 - SKILLS_GIT_BRANCH: branch to pull/clone (default: main)
+- SKILLS_SYNC_MIN_INTERVAL: seconds to wait after a git sync before syncing again on startup (default: 300)
 - SKILLS_DIR: override path to the skills directory (default: <repo_root>/skills)
 - USER_SKILLS_DIR: override path to user-skills overlay directory (default: <repo_root>/user-skills)
 - LOG_FILE: override log file path (default: <repo_root>/logs/skills_mcp_server.log)
+- SKILLS_SNAPSHOT_FILE: override discovery snapshot path (default: <repo_root>/.cache/skills_snapshot.json)
 
 User Skills Directory:
 - User-created notes and assets can be placed in <repo_root>/user-skills/<skill-name>/notes/
@@ -45,22 +47,62 @@ Entry point: python -m skills_mcp.server
 
 from __future__ import annotations
 
-import argparse
+import asyncio
+import atexit
 import base64
+import binascii
+import bisect
+import codecs
+import functools
+import io
 import json
 import logging
+import mimetypes
+import operator
 import os
+import queue
+import re
 import shutil
+import stat
 import subprocess
+import sys
+import tempfile
 import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from mimetypes import guess_type
-from pathlib import Path
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path, PurePath
+from typing import TYPE_CHECKING, Any
 
 import yaml
-from fastmcp import FastMCP
+
+if TYPE_CHECKING:
+    import argparse
+
+    from fastmcp import FastMCP
+
+try:
+    # libyaml-backed loader/dumper; several times faster than the pure-Python ones
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    # Optional fast JSON encoder for CLI output (pip install skills-mcp[fast])
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+try:
+    # Optional SIMD base64 codec for binary asset uploads (pip install skills-mcp[fast])
+    import pybase64 as _pybase64
+except ImportError:
+    _pybase64 = None
 
 # --- Paths & constants ---
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -71,6 +113,7 @@ DEFAULT_LOG_FILE = DEFAULT_LOG_DIR / "skills_mcp_server.log"
 DEFAULT_TRASH_DIR = REPO_ROOT / "trash"
 DEFAULT_OPS_LOG_DIR = REPO_ROOT / "logs"
 DEFAULT_OPS_LOG_FILE = DEFAULT_OPS_LOG_DIR / "skills_mcp_operations.log"
+DEFAULT_SNAPSHOT_FILE = REPO_ROOT / ".cache" / "skills_snapshot.json"
 SERVER_NAME = "ClaudeSkills"
 
 
@@ -81,6 +124,8 @@ def configure_logging() -> logging.Logger:
 
     - Creates logs directory if needed.
     - Sets formatter and levels.
+    - Routes records through a queue so callers never block on console or file I/O;
+      a background QueueListener writes them out and is stopped at exit.
     - Returns the configured root logger for reuse.
     """
     logger = logging.getLogger(SERVER_NAME)
@@ -99,13 +144,19 @@ def configure_logging() -> logging.Logger:
     sh = logging.StreamHandler()
     sh.setLevel(logging.INFO)
     sh.setFormatter(formatter)
-    logger.addHandler(sh)
 
-    # Rotating file handler (5 files, 5MB each)
-    fh = RotatingFileHandler(log_file, maxBytes=5 * 1024 * 1024, backupCount=5)
+    # Rotating file handler (5 files, 5MB each); the file is opened on the first record
+    fh = RotatingFileHandler(
+        log_file, maxBytes=5 * 1024 * 1024, backupCount=5, delay=True
+    )
     fh.setLevel(logging.INFO)
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, sh, fh, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
     logger.info("Logging initialized. File: %s", str(log_file))
     return logger
@@ -170,20 +221,55 @@ def _git_run(args: list[str], cwd: Path, logger: logging.Logger) -> None:
             text=True,
             check=False,
         )
-        logger.info("git %s\n%s", " ".join(args), res.stdout.strip())
+        # The join/strip arguments are built eagerly, so skip them when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("git %s\n%s", " ".join(args), res.stdout.strip())
     except Exception as exc:
         logger.error("Git command failed: git %s (%s)", " ".join(args), exc)
 
 
+def _sync_stamp(skills_dir: Path) -> Path:
+    """
+    function_purpose: Path of the file whose mtime records the last git sync of skills_dir.
+    """
+    return skills_dir / ".git" / "SKILLS_MCP_LAST_SYNC"
+
+
+def _sync_min_interval() -> float:
+    """
+    function_purpose: Minimum seconds between git syncs, from SKILLS_SYNC_MIN_INTERVAL (default 300).
+    """
+    try:
+        return float(os.environ.get("SKILLS_SYNC_MIN_INTERVAL", "300"))
+    except ValueError:
+        return 300.0
+
+
+def _touch_sync_stamp(skills_dir: Path, logger: logging.Logger) -> None:
+    try:
+        _sync_stamp(skills_dir).touch()
+    except OSError as exc:
+        logger.debug("Could not record git sync time: %s", exc)
+
+
 def _git_sync(skills_dir: Path, logger: logging.Logger) -> None:
     """
     function_purpose: Clone or pull the skills repository in the background on server startup.
 
     Behavior:
-    - If skills_dir is a git repo: fetch + pull ff-only.
-    - If not a repo and SKILLS_GIT_URL is set: clone depth=1 on branch.
+    - If skills_dir is a git repo: a single ff-only pull of the branch.
+    - If not a repo and SKILLS_GIT_URL is set: shallow single-branch clone.
     - If neither condition applies: skip with info.
+    - Skips entirely if the last sync was less than SKILLS_SYNC_MIN_INTERVAL seconds ago.
     """
+    try:
+        age = time.time() - _sync_stamp(skills_dir).stat().st_mtime
+    except OSError:
+        age = None
+    if age is not None and age < _sync_min_interval():
+        logger.info("Skipping git sync; last sync was %.0f seconds ago.", age)
+        return
+
     git_url = (
         os.environ.get("SKILLS_GIT_URL") or "https://github.com/anthropics/skills"
     ).strip()
@@ -193,9 +279,11 @@ def _git_sync(skills_dir: Path, logger: logging.Logger) -> None:
         logger.info(
             "Skills directory is a git repo; fetching latest on branch '%s'.", branch
         )
-        _git_run(["fetch", "origin"], cwd=skills_dir, logger=logger)
-        _git_run(["checkout", branch], cwd=skills_dir, logger=logger)
+        # One process: pull fetches just this branch, and the single-branch clone is
+        # already on it
         _git_run(["pull", "--ff-only", "origin", branch], cwd=skills_dir, logger=logger)
+        _touch_sync_stamp(skills_dir, logger)
+        _invalidate(skills_dir)
         return
 
     if git_url:
@@ -214,10 +302,20 @@ def _git_sync(skills_dir: Path, logger: logging.Logger) -> None:
         # If directory is non-empty, clone into temp then move/replace could be added;
         # for simplicity, clone directly targeting the directory.
         _git_run(
-            ["clone", "--depth=1", "-b", branch, git_url, target_name],
+            [
+                "clone",
+                "--depth=1",
+                "--single-branch",
+                "-b",
+                branch,
+                git_url,
+                target_name,
+            ],
             cwd=parent,
             logger=logger,
         )
+        _touch_sync_stamp(skills_dir, logger)
+        _invalidate(skills_dir)
     else:
         logger.info(
             "No SKILLS_GIT_URL provided; skipping clone. Using local skills directory."
@@ -241,45 +339,198 @@ def start_background_git_sync(skills_dir: Path, logger: logging.Logger) -> None:
 
 
 # --- Skills parsing and utilities ---
-def _parse_frontmatter_and_body(text: str) -> tuple[dict[str, Any], str]:
+_FM_BEGIN_ERROR = "SKILL.md must begin with a '---' line for YAML frontmatter"
+_FM_END_ERROR = "YAML frontmatter must end with a '---' line"
+# A frontmatter delimiter: '---' at column 0 followed only by blanks
+_FM_DELIM = re.compile(r"(?m)^---[ \t\r]*$")
+_FM_DELIM_BYTES = re.compile(_FM_DELIM.pattern.encode())
+
+
+def _split_frontmatter(text: str) -> tuple[str, str]:
+    """
+    function_purpose: Split a document into its raw YAML frontmatter text and markdown body.
+
+    Locates the closing delimiter with the precompiled _FM_DELIM pattern and slices the
+    original text, so the document is never split into lines or re-joined.
+    """
+    first_nl = text.find("\n")
+    first_line = text if first_nl == -1 else text[:first_nl]
+    if first_line.strip() != "---":
+        raise ValueError(_FM_BEGIN_ERROR)
+    if first_nl == -1:
+        raise ValueError(_FM_END_ERROR)
+
+    start = first_nl + 1
+    end = _FM_DELIM.search(text, start)
+    if end is None:
+        raise ValueError(_FM_END_ERROR)
+    return text[start : end.start()], text[end.end() + 1 :]
+
+
+# Fast frontmatter subset: top-level Agent Skills Spec keys with string/list values
+_FAST_FM_KEYS = frozenset({"name", "description", "license", "allowed-tools", "metadata"})
+_FAST_FM_KEY_LINE = re.compile(r"([a-z-]+):(?: +(.*))?")
+_FAST_FM_ITEM_LINE = re.compile(r"( *)- +(.*)")
+# Plain scalars starting with these may be YAML indicators, numbers, dates or null
+_FAST_FM_UNSAFE_START = frozenset("-?:,[]{}#&*!|>'\"%@`+.0123456789~=<")
+# Plain scalars YAML 1.1 resolves to booleans or null
+_FAST_FM_RESERVED = frozenset(
+    "yes Yes YES no No NO true True TRUE false False FALSE "
+    "on On ON off Off OFF null Null NULL".split()
+)
+
+
+def _fast_scalar(value: str, in_flow: bool = False) -> str | None:
     """
-    function_purpose: Parse YAML frontmatter delimited by '---' lines, followed by markdown body.
+    function_purpose: Interpret a stripped YAML scalar that is unambiguously a string, else None.
+    """
+    if not value or not value.isprintable():
+        return None
+    quote = value[0]
+    if quote in "\"'":
+        inner = value[1:-1]
+        if len(value) < 2 or value[-1] != quote or quote in inner:
+            return None
+        if quote == '"' and "\\" in inner:
+            return None
+        return inner
+    if quote in _FAST_FM_UNSAFE_START or value in _FAST_FM_RESERVED:
+        return None
+    if ": " in value or " #" in value or value.endswith(":"):
+        return None
+    if in_flow and any(c in value for c in ",[]{}:#"):
+        return None
+    return value
 
-    Returns a (frontmatter_dict, body_text) tuple.
+
+def _fast_flow_list(value: str) -> list[str] | None:
     """
-    lines = text.splitlines(keepends=False)
-    if not lines or lines[0].strip() != "---":
-        raise ValueError("SKILL.md must begin with a '---' line for YAML frontmatter")
+    function_purpose: Interpret a one-line '[a, b]' flow sequence of string scalars, else None.
+    """
+    if not value.endswith("]"):
+        return None
+    inner = value[1:-1].strip()
+    if not inner:
+        return []
+    items: list[str] = []
+    for part in inner.split(","):
+        item = _fast_scalar(part.strip(), in_flow=True)
+        if item is None:
+            return None
+        items.append(item)
+    return items
+
+
+def _fast_frontmatter_parse(fm_text: str) -> dict[str, Any] | None:
+    """
+    function_purpose: Parse the flat frontmatter subset most SKILL.md files use without PyYAML.
+
+    Handles 'key: scalar', 'key: [a, b]' and 'key:' followed by '- item' lines for the
+    Agent Skills Spec keys. Returns None on anything else (nested mappings, comments,
+    multi-line or non-string scalars, duplicate keys) so the caller falls back to YAML.
+    """
+    fm: dict[str, Any] = {}
+    list_key: str | None = None
+    list_indent = ""
+    for line in fm_text.splitlines():
+        if not line.strip():
+            continue
+        item = _FAST_FM_ITEM_LINE.fullmatch(line)
+        if item is not None:
+            if list_key is None:
+                return None
+            items = fm[list_key]
+            if not items:
+                list_indent = item.group(1)
+            elif item.group(1) != list_indent:
+                return None
+            value = _fast_scalar(item.group(2).rstrip())
+            if value is None:
+                return None
+            items.append(value)
+            continue
 
-    fm_lines: list[str] = []
-    idx = 1
-    while idx < len(lines) and lines[idx].strip() != "---":
-        fm_lines.append(lines[idx])
-        idx += 1
+        m = _FAST_FM_KEY_LINE.fullmatch(line)
+        if m is None:
+            return None
+        key = m.group(1)
+        if key not in _FAST_FM_KEYS or key in fm:
+            return None
+        # A bare 'key:' without items is null in YAML; leave that to the loader
+        if list_key is not None and not fm[list_key]:
+            return None
+        list_key = None
+        raw = (m.group(2) or "").strip()
+        if not raw:
+            fm[key] = []
+            list_key = key
+            continue
+        parsed = _fast_flow_list(raw) if raw[0] == "[" else _fast_scalar(raw)
+        if parsed is None:
+            return None
+        fm[key] = parsed
 
-    if idx >= len(lines) or lines[idx].strip() != "---":
-        raise ValueError("YAML frontmatter must end with a '---' line")
+    if list_key is not None and not fm[list_key]:
+        return None
+    return fm
 
-    fm_text = "\n".join(fm_lines)
-    body = "\n".join(lines[idx + 1 :])
 
-    fm = yaml.safe_load(fm_text) or {}
+def _load_frontmatter(fm_text: str | bytes) -> dict[str, Any]:
+    """
+    function_purpose: Parse raw frontmatter text (str or UTF-8 bytes) into a mapping.
+
+    Tries _fast_frontmatter_parse first and falls back to YAML for anything it declines.
+    Bytes are handed to the YAML loader as-is, which libyaml reads without re-encoding.
+    """
+    text = fm_text.decode("utf-8") if isinstance(fm_text, bytes) else fm_text
+    fast = _fast_frontmatter_parse(text)
+    if fast is not None:
+        return fast
+    fm = yaml.load(fm_text, Loader=_YamlLoader) or {}
     if not isinstance(fm, dict):
         raise ValueError("YAML frontmatter must parse to a mapping")
-    return fm, body
+    return fm
 
 
-def parse_skill_md(md_path: Path, skills_dir: Path) -> dict[str, Any]:
+def _parse_frontmatter_and_body(text: str) -> tuple[dict[str, Any], str]:
     """
-    function_purpose: Parse a SKILL.md file to structured data per Agent Skills Spec.
+    function_purpose: Parse YAML frontmatter delimited by '---' lines, followed by markdown body.
+
+    Returns a (frontmatter_dict, body_text) tuple.
+    """
+    fm_text, body = _split_frontmatter(text)
+    return _load_frontmatter(fm_text), body
+
+
+def _read_frontmatter_bytes(md_path: Path) -> bytes:
+    """
+    function_purpose: Read only the raw frontmatter block of a SKILL.md, stopping at the closing '---' line.
+
+    Reads in binary mode, so nothing is decoded here and the markdown body is never read from disk.
+    """
+    with open(md_path, "rb") as f:
+        if f.readline().strip() != b"---":
+            raise ValueError(_FM_BEGIN_ERROR)
+        fm_lines: list[bytes] = []
+        for line in f:
+            if _FM_DELIM_BYTES.match(line):
+                return b"".join(fm_lines)
+            fm_lines.append(line)
+    raise ValueError(_FM_END_ERROR)
+
+
+def _skill_from_frontmatter(
+    fm: dict[str, Any], md_path: Path, skills_dir: Path, body: str | None = None
+) -> dict[str, Any]:
+    """
+    function_purpose: Validate parsed frontmatter per Agent Skills Spec and shape it into a skill dict.
 
     Enforces:
     - 'name' (hyphen-case) and 'description' strings are required
     - immediate directory name must match 'name'
-    """
-    text = md_path.read_text(encoding="utf-8")
-    fm, body = _parse_frontmatter_and_body(text)
 
+    The 'body' key is only set when a body is given.
+    """
     name = fm.get("name")
     description = fm.get("description")
     license_ = fm.get("license")
@@ -302,24 +553,413 @@ def parse_skill_md(md_path: Path, skills_dir: Path) -> dict[str, Any]:
         )
 
     rel_path = str(md_path.relative_to(skills_dir))
-    return {
+    skill = {
         "name": name,
         "description": description,
         "license": license_ if isinstance(license_, str) else None,
         "allowed_tools": allowed_tools if isinstance(allowed_tools, list) else None,
         "metadata": metadata if isinstance(metadata, dict) else None,
         "path": rel_path,
-        "body": body,
     }
+    if body is not None:
+        skill["body"] = body
+    return skill
+
+
+def parse_skill_md(md_path: Path, skills_dir: Path) -> dict[str, Any]:
+    """
+    function_purpose: Parse a SKILL.md file to structured data per Agent Skills Spec.
+
+    Returns frontmatter fields plus the full markdown body.
+    """
+    text = md_path.read_text(encoding="utf-8")
+    fm, body = _parse_frontmatter_and_body(text)
+    return _skill_from_frontmatter(fm, md_path, skills_dir, body)
+
+
+def parse_skill_md_header(md_path: Path, skills_dir: Path) -> dict[str, Any]:
+    """
+    function_purpose: Parse only the frontmatter of a SKILL.md; the result has no 'body' key.
+
+    Applies the same validation as parse_skill_md but reads just the lines up to the
+    closing '---', which is all that listing and name resolution need.
+    """
+    fm = _load_frontmatter(_read_frontmatter_bytes(md_path))
+    return _skill_from_frontmatter(fm, md_path, skills_dir)
+
+
+@functools.lru_cache(maxsize=256)
+def _load_body_cached(path_s: str, mtime_ns: int, size: int) -> str:
+    """
+    function_purpose: Read and split a SKILL.md body, memoized per (path, mtime_ns, size).
+    """
+    return _split_frontmatter(Path(path_s).read_text(encoding="utf-8"))[1]
+
+
+def load_skill_body(md_path: Path) -> str:
+    """
+    function_purpose: Read the markdown body of a SKILL.md on demand, skipping the frontmatter.
+
+    Bodies are memoized while the file's mtime and size are unchanged, so repeated
+    get_skill calls cost one stat. Raises OSError if the file cannot be read and
+    ValueError if the delimiters are missing; failures are not cached.
+    """
+    st = md_path.stat()
+    return _load_body_cached(str(md_path), st.st_mtime_ns, st.st_size)
+
+
+def _walk_skill_mds(skills_dir: Path) -> Iterator[tuple[Path, os.stat_result]]:
+    """
+    function_purpose: Yield (path, stat) for every SKILL.md under skills_dir with one scandir pass per directory.
+
+    Follows symlinked directories (guarding against cycles via their real paths) and stops
+    descending once a directory below skills_dir contains a SKILL.md, since skills do not nest.
+    Each SKILL.md is stat'ed exactly once; files that vanish mid-walk are skipped.
+    """
+    root = os.fspath(skills_dir)
+    # (path, real path) of directories still to scan
+    pending: deque[tuple[str, str]] = deque([(root, os.path.realpath(root))])
+    seen: set[str] = set()
+    while pending:
+        dir_path, real = pending.pop()
+        if real in seen:
+            continue
+        seen.add(real)
+        subdirs: list[tuple[str, str]] = []
+        skill_md: os.DirEntry[str] | None = None
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        sub_real = (
+                            os.path.realpath(entry.path)
+                            if entry.is_symlink()
+                            else os.path.join(real, entry.name)
+                        )
+                        subdirs.append((entry.path, sub_real))
+                    elif entry.name == "SKILL.md":
+                        skill_md = entry
+        except OSError:
+            continue
+        if skill_md is not None:
+            try:
+                yield Path(skill_md.path), skill_md.stat()
+            except OSError:
+                pass
+            if dir_path != root:
+                continue
+        pending.extend(subdirs)
 
 
 def iter_skill_md_paths(skills_dir: Path) -> list[Path]:
     """
     function_purpose: Locate all SKILL.md files under skills_dir recursively.
+
+    See _walk_skill_mds for the traversal rules.
+    """
+    return [md_path for md_path, _ in _walk_skill_mds(skills_dir)]
+
+
+# --- Discovery cache ---
+# Parsed SKILL.md entries keyed by (skills_dir, md_path) -> (st_mtime_ns, st_size, parsed).
+# Only valid skills are cached; invalid ones are re-parsed when their manifest changes.
+_SKILLS_CACHE: dict[tuple[Path, Path], tuple[int, int, dict[str, Any]]] = {}
+# Last (path, st_mtime_ns, st_size) manifest and discovery result per skills_dir.
+_DISCOVERY_MANIFEST: dict[Path, tuple[tuple[str, int, int], ...]] = {}
+_DISCOVERY_RESULT: dict[Path, list[dict[str, Any]]] = {}
+# Listing view of _DISCOVERY_RESULT (no body), built once per manifest.
+_BRIEF_RESULT: dict[Path, list[dict[str, Any]]] = {}
+_BRIEF_KEYS = ("name", "description", "license", "allowed_tools", "metadata", "path")
+# Skill name -> first discovered entry (invalid ones included) per skills_dir, for get_skill.
+_BY_NAME: dict[Path, dict[str, dict[str, Any]]] = {}
+# Skill name -> skill directory per skills_dir (valid skills only), rebuilt with the manifest.
+_NAME_TO_DIR: dict[Path, dict[str, Path]] = {}
+# Skills dirs whose on-disk snapshot was already consulted; it is only trusted once per process.
+_SNAPSHOT_CHECKED: set[Path] = set()
+# Guards the per-skills_dir dicts above (and _SEARCH_INDEX): the git sync thread invalidates
+# them while tool calls read them. Reentrant so lookups can hold it across discover_skills.
+_DISCOVERY_LOCK = threading.RLock()
+# Shared worker pool for parsing SKILL.md files; created lazily on first cache miss.
+_PARSE_EXECUTOR: ThreadPoolExecutor | None = None
+_PARSE_EXECUTOR_LOCK = threading.Lock()
+
+
+def _parse_executor() -> ThreadPoolExecutor:
+    """
+    function_purpose: Return the shared SKILL.md parsing pool, creating it on first use.
+
+    The pool is reused across discovery calls and shut down at interpreter exit.
+    """
+    global _PARSE_EXECUTOR
+    with _PARSE_EXECUTOR_LOCK:
+        if _PARSE_EXECUTOR is None:
+            _PARSE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="SkillParse"
+            )
+            atexit.register(_PARSE_EXECUTOR.shutdown, wait=False)
+        return _PARSE_EXECUTOR
+
+
+def _stat_skill_md_paths(skills_dir: Path) -> list[tuple[Path, os.stat_result]]:
     """
-    if not skills_dir.exists():
-        return []
-    return list(skills_dir.rglob("SKILL.md"))
+    function_purpose: Stat every SKILL.md under skills_dir, sorted by path.
+
+    Files that vanish between listing and stat are skipped.
+    """
+    entries = list(_walk_skill_mds(skills_dir))
+    entries.sort(key=lambda e: str(e[0]))
+    return entries
+
+
+def _build_manifest(
+    entries: list[tuple[Path, os.stat_result]],
+) -> tuple[tuple[str, int, int], ...]:
+    """
+    function_purpose: Build the (path, mtime_ns, size) manifest used to validate cached discovery results.
+    """
+    return tuple((str(p), st.st_mtime_ns, st.st_size) for p, st in entries)
+
+
+def _snapshot_path() -> Path:
+    """
+    function_purpose: Resolve the on-disk discovery snapshot file.
+
+    Uses DEFAULT_SNAPSHOT_FILE by default; can be overridden via SKILLS_SNAPSHOT_FILE env var.
+    """
+    env_file = os.environ.get("SKILLS_SNAPSHOT_FILE")
+    return Path(env_file) if env_file else DEFAULT_SNAPSHOT_FILE
+
+
+def _read_snapshot_file() -> dict[str, Any]:
+    """
+    function_purpose: Read the whole snapshot file, returning an empty mapping if missing or unreadable.
+    """
+    try:
+        raw = _snapshot_path().read_bytes()
+        data = _orjson.loads(raw) if _orjson is not None else json.loads(raw)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != 1:
+        return {}
+    return data
+
+
+def _load_snapshot(
+    skills_dir: Path,
+) -> tuple[tuple[tuple[str, int, int], ...], list[dict[str, Any]], set[str]] | None:
+    """
+    function_purpose: Load the snapshot for skills_dir as (manifest, skills, invalid_paths).
+
+    Returns None when no usable snapshot exists for this directory.
+    """
+    entry = _read_snapshot_file().get("dirs", {}).get(str(skills_dir))
+    if not isinstance(entry, dict):
+        return None
+    try:
+        manifest = tuple((str(p), int(m), int(z)) for p, m, z in entry["manifest"])
+        skills = list(entry["skills"])
+        invalid = set(entry.get("invalid", []))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return manifest, skills, invalid
+
+
+def _write_snapshot(
+    skills_dir: Path,
+    skills: list[dict[str, Any]],
+    manifest: tuple[tuple[str, int, int], ...],
+    invalid: set[str],
+) -> None:
+    """
+    function_purpose: Atomically persist the discovery result for skills_dir to the snapshot file.
+
+    Entries for directories that no longer exist are pruned. Failures are logged and ignored;
+    the snapshot is only an optimization.
+    """
+    snapshot_file = _snapshot_path()
+    try:
+        data = _read_snapshot_file()
+        dirs = {d: e for d, e in data.get("dirs", {}).items() if Path(d).is_dir()}
+        dirs[str(skills_dir)] = {
+            "manifest": [list(m) for m in manifest],
+            "skills": skills,
+            "invalid": sorted(invalid),
+        }
+        snapshot = {"version": 1, "dirs": dirs}
+        if _orjson is not None:
+            # Same key coercion as json.dumps; datetimes still raise instead of becoming strings
+            payload = _orjson.dumps(
+                snapshot,
+                option=_orjson.OPT_NON_STR_KEYS | _orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        else:
+            payload = json.dumps(snapshot, ensure_ascii=False).encode("utf-8")
+        snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=snapshot_file.name, suffix=".tmp", dir=snapshot_file.parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                _ = f.write(payload)
+            os.replace(tmp_name, snapshot_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except Exception:
+        logging.getLogger(SERVER_NAME).debug(
+            "Failed to write skills snapshot", exc_info=True
+        )
+
+
+def _cached_skill(
+    md_path: Path, skills_dir: Path, st: os.stat_result
+) -> dict[str, Any] | None:
+    """
+    function_purpose: Return the cached parse of a SKILL.md if its mtime/size are unchanged, else None.
+    """
+    cached = _SKILLS_CACHE.get((skills_dir, md_path))
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    return None
+
+
+def _build_name_index(
+    skills_dir: Path, skills: list[dict[str, Any]], invalid: set[str]
+) -> dict[str, Path]:
+    """
+    function_purpose: Map each valid skill name to its directory.
+
+    A skill at skills_dir/<name> wins, as in skill_dir_for_name's fast path; otherwise
+    the first entry in sorted order does.
+    """
+    index: dict[str, Path] = {}
+    for s in skills:
+        if s["path"] in invalid:
+            continue
+        if _is_top_level_skill(s):
+            index[s["name"]] = (skills_dir / s["path"]).parent
+        else:
+            _ = index.setdefault(s["name"], (skills_dir / s["path"]).parent)
+    return index
+
+
+def _is_top_level_skill(skill: dict[str, Any]) -> bool:
+    """
+    function_purpose: Check whether a discovered entry is skills_dir/<name>/SKILL.md.
+    """
+    return skill["path"] == os.path.join(skill["name"], "SKILL.md")
+
+
+def _parse_skill_md_cached(
+    md_path: Path, skills_dir: Path, st: os.stat_result
+) -> dict[str, Any]:
+    """
+    function_purpose: Parse a SKILL.md header, reusing the cached result while its mtime/size are unchanged.
+
+    Raises the same errors as parse_skill_md_header for invalid files.
+    """
+    cached = _cached_skill(md_path, skills_dir, st)
+    if cached is not None:
+        return cached
+    data = parse_skill_md_header(md_path, skills_dir)
+    _SKILLS_CACHE[(skills_dir, md_path)] = (st.st_mtime_ns, st.st_size, data)
+    return data
+
+
+def _invalid_skill_entry(
+    md_path: Path, skills_dir: Path, exc: Exception
+) -> dict[str, Any]:
+    """
+    function_purpose: Build the placeholder entry reported for a SKILL.md that failed to parse.
+    """
+    rel_path = str(md_path.relative_to(skills_dir))
+    return {
+        "name": md_path.parent.name,
+        "description": f"Invalid SKILL.md: {exc}",
+        "license": None,
+        "allowed_tools": None,
+        "metadata": {"error": str(exc), "path": rel_path},
+        "path": rel_path,
+    }
+
+
+def _find_skill_cold(
+    skills_dir: Path, name: str, valid_only: bool
+) -> dict[str, Any] | None:
+    """
+    function_purpose: Resolve one skill by name before skills_dir has been fully discovered.
+
+    A valid skill must live in a directory named after it, and invalid ones are reported under
+    their directory name, so only SKILL.md files in directories called `name` are parsed:
+    skills_dir/<name> first, then in path order, stopping at the first valid one. Without
+    valid_only, the first invalid entry is returned if none is valid. Matches what
+    discover_skills would pick.
+    """
+    top = skills_dir / name
+    candidates = sorted(
+        (e for e in _walk_skill_mds(skills_dir) if e[0].parent.name == name),
+        key=lambda e: (e[0].parent != top, str(e[0])),
+    )
+    first_invalid: dict[str, Any] | None = None
+    for md_path, st in candidates:
+        try:
+            return _parse_skill_md_cached(md_path, skills_dir, st)
+        except Exception as exc:
+            if not valid_only and first_invalid is None:
+                first_invalid = _invalid_skill_entry(md_path, skills_dir, exc)
+    return first_invalid
+
+
+def _build_briefs(skills: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [{k: s[k] for k in _BRIEF_KEYS if k in s} for s in skills]
+
+
+def _build_by_name(
+    skills_dir: Path, skills: list[dict[str, Any]], name_to_dir: dict[str, Path]
+) -> dict[str, dict[str, Any]]:
+    """
+    function_purpose: Map each skill name to the entry get_skill reports.
+
+    That is the entry in the directory name_to_dir resolves the name to, so metadata
+    agrees with the notes and assets found via skill_dir_for_name. Names without a valid
+    entry map to the invalid one at skills_dir/<name>, else to their first entry.
+    """
+    by_name: dict[str, dict[str, Any]] = {}
+    for s in skills:
+        name = s["name"]
+        resolved = name_to_dir.get(name)
+        if resolved is None:
+            preferred = _is_top_level_skill(s)
+        else:
+            preferred = resolved == (skills_dir / s["path"]).parent
+        if preferred:
+            by_name[name] = s
+        else:
+            _ = by_name.setdefault(name, s)
+    return by_name
+
+
+def _seed_from_snapshot(
+    skills_dir: Path,
+    manifest: tuple[tuple[str, int, int], ...],
+    snap_manifest: tuple[tuple[str, int, int], ...],
+    cached_skills: list[dict[str, Any]],
+    invalid: set[str],
+) -> None:
+    """
+    function_purpose: Prime _SKILLS_CACHE with snapshot entries whose SKILL.md mtime/size still match.
+
+    Invalid entries are skipped so their errors are re-reported by a fresh parse.
+    """
+    current = {p: (m, z) for p, m, z in manifest}
+    stamps = {p: (m, z) for p, m, z in snap_manifest}
+    for s in cached_skills:
+        if s["path"] in invalid:
+            continue
+        md_path = skills_dir / s["path"]
+        stamp = current.get(str(md_path))
+        if stamp is not None and stamps.get(str(md_path)) == stamp:
+            _SKILLS_CACHE[(skills_dir, md_path)] = (stamp[0], stamp[1], s)
 
 
 def discover_skills(
@@ -329,29 +969,125 @@ def discover_skills(
     function_purpose: Discover and parse all skills under the skills_dir.
 
     Returns list of parsed skill dicts; invalid skills included with error metadata.
+    Only frontmatter is parsed, so entries carry no 'body'; get_skill loads it on demand.
+    Results are cached per skills_dir and revalidated against a (path, mtime, size)
+    manifest, so unchanged SKILL.md files are never re-read or re-parsed.
     """
+    with _DISCOVERY_LOCK:
+        return _discover_skills_locked(skills_dir, logger)
+
+
+def _discover_skills_locked(
+    skills_dir: Path, logger: logging.Logger | None
+) -> list[dict[str, Any]]:
+    """
+    function_purpose: Body of discover_skills; the caller holds _DISCOVERY_LOCK.
+    """
+    entries = _stat_skill_md_paths(skills_dir)
+    manifest = _build_manifest(entries)
+    if _DISCOVERY_MANIFEST.get(skills_dir) == manifest:
+        return list(_DISCOVERY_RESULT[skills_dir])
+
+    if skills_dir not in _SNAPSHOT_CHECKED:
+        # Cold process: seed the parse cache with snapshot entries whose SKILL.md is
+        # unchanged, and reuse the whole result if nothing changed since it was written
+        _SNAPSHOT_CHECKED.add(skills_dir)
+        snapshot = _load_snapshot(skills_dir)
+        if snapshot is not None:
+            snap_manifest, cached_skills, invalid = snapshot
+            _seed_from_snapshot(
+                skills_dir, manifest, snap_manifest, cached_skills, invalid
+            )
+            if snap_manifest == manifest:
+                _NAME_TO_DIR[skills_dir] = _build_name_index(
+                    skills_dir, cached_skills, invalid
+                )
+                _DISCOVERY_MANIFEST[skills_dir] = manifest
+                _DISCOVERY_RESULT[skills_dir] = cached_skills
+                _BRIEF_RESULT[skills_dir] = _build_briefs(cached_skills)
+                _BY_NAME[skills_dir] = _build_by_name(
+                    skills_dir, cached_skills, _NAME_TO_DIR[skills_dir]
+                )
+                return list(cached_skills)
+
     skills: list[dict[str, Any]] = []
-    for md_path in iter_skill_md_paths(skills_dir):
-        try:
-            data = parse_skill_md(md_path, skills_dir)
+    invalid_paths: set[str] = set()
+    misses: list[tuple[Path, os.stat_result]] = []
+    for md_path, st in entries:
+        data = _cached_skill(md_path, skills_dir, st)
+        if data is None:
+            misses.append((md_path, st))
+        else:
             skills.append(data)
+
+    # Parse changed/new files in parallel; reads and libyaml parsing overlap well in threads
+    futures: dict[Future[dict[str, Any]], Path] = {}
+    if misses:
+        executor = _parse_executor()
+        futures = {
+            executor.submit(_parse_skill_md_cached, md_path, skills_dir, st): md_path
+            for md_path, st in misses
+        }
+    for future in as_completed(futures):
+        md_path = futures[future]
+        try:
+            skills.append(future.result())
         except Exception as exc:
-            rel_path = str(md_path.relative_to(skills_dir))
+            entry = _invalid_skill_entry(md_path, skills_dir, exc)
+            invalid_paths.add(entry["path"])
             if logger:
-                logger.error("Failed parsing %s: %s", rel_path, exc)
-            skills.append(
-                {
-                    "name": md_path.parent.name,
-                    "description": f"Invalid SKILL.md: {exc}",
-                    "license": None,
-                    "allowed_tools": None,
-                    "metadata": {"error": str(exc), "path": rel_path},
-                    "path": rel_path,
-                    "body": "",
-                }
-            )
+                logger.error("Failed parsing %s: %s", entry["path"], exc)
+            skills.append(entry)
     skills.sort(key=lambda s: (s.get("name") or "", s.get("path") or ""))
-    return skills
+
+    # Drop cache entries for SKILL.md files that no longer exist
+    live = {md_path for md_path, _ in entries}
+    for key in [k for k in _SKILLS_CACHE if k[0] == skills_dir and k[1] not in live]:
+        del _SKILLS_CACHE[key]
+    _NAME_TO_DIR[skills_dir] = _build_name_index(skills_dir, skills, invalid_paths)
+    _DISCOVERY_MANIFEST[skills_dir] = manifest
+    _DISCOVERY_RESULT[skills_dir] = skills
+    _BRIEF_RESULT[skills_dir] = _build_briefs(skills)
+    _BY_NAME[skills_dir] = _build_by_name(skills_dir, skills, _NAME_TO_DIR[skills_dir])
+    _write_snapshot(skills_dir, skills, manifest, invalid_paths)
+    return list(skills)
+
+
+def _invalidate(skills_dir: Path) -> None:
+    """
+    function_purpose: Drop all cached discovery and search state for skills_dir.
+
+    The next discovery re-parses every SKILL.md instead of trusting mtime/size, which
+    matters after bulk rewrites such as a git pull that may preserve both.
+    """
+    with _DISCOVERY_LOCK:
+        for key in [k for k in _SKILLS_CACHE if k[0] == skills_dir]:
+            del _SKILLS_CACHE[key]
+        for cache in (
+            _DISCOVERY_MANIFEST,
+            _DISCOVERY_RESULT,
+            _BRIEF_RESULT,
+            _BY_NAME,
+            _NAME_TO_DIR,
+            _SEARCH_INDEX,
+        ):
+            _ = cache.pop(skills_dir, None)
+    # Bodies are keyed by file, not skills_dir; a rewrite may keep mtime and size
+    _load_body_cached.cache_clear()
+
+
+def discover_skill_briefs(
+    skills_dir: Path, logger: logging.Logger | None = None
+) -> list[dict[str, Any]]:
+    """
+    function_purpose: List skills under skills_dir with brief metadata only (no body).
+
+    The brief entries are built once per discovery manifest and shared between calls;
+    treat them as read-only.
+    """
+    with _DISCOVERY_LOCK:
+        _ = discover_skills(skills_dir, logger=logger)
+        return list(_BRIEF_RESULT[skills_dir])
 
 
 def get_skill(
@@ -367,112 +1103,253 @@ def get_skill(
     Returns dict with skill details. If include_notes=True, the body field will have
     notes appended in markdown format for complete context.
     """
-    for skill in discover_skills(skills_dir):
-        if skill.get("name") == name:
-            if include_notes:
-                # Append notes to the body from multiple sources:
-                # 1. Skill's own _notes/ and notes/ directories
-                # 2. User overlay from user-skills/<skill-name>/notes/
-                skill_root = skill_dir_for_name(skills_dir, name)
-                user_skills_dir = _resolve_user_skills_dir()
-                note_files: list[Path] = []
-
-                # Check skill's own notes directories
-                for notes_dirname in ["_notes", "notes"]:
-                    notes_dir = skill_root / notes_dirname
-                    if notes_dir.exists() and notes_dir.is_dir():
-                        note_files.extend(
-                            [f for f in notes_dir.rglob("*") if f.is_file()]
-                        )
+    with _DISCOVERY_LOCK:
+        if skills_dir in _DISCOVERY_MANIFEST:
+            _ = discover_skills(skills_dir)
+            skill = _BY_NAME[skills_dir].get(name)
+        else:
+            skill = _find_skill_cold(skills_dir, name, valid_only=False)
+    if skill is None:
+        raise ValueError(f"skill '{name}' not found")
+    # Copy the entry so the cache is never mutated, then load the body on demand
+    skill = dict(skill)
+    try:
+        skill["body"] = load_skill_body(skills_dir / skill["path"])
+    except (OSError, ValueError):
+        skill["body"] = ""
+    if include_notes:
+        # Append notes to the body from multiple sources:
+        # 1. Skill's own _notes/ and notes/ directories
+        # 2. User overlay from user-skills/<skill-name>/notes/
+        skill_root = skill_dir_for_name(skills_dir, name)
+        user_skills_dir = _resolve_user_skills_dir()
+        note_files: list[Path] = []
 
-                # Check user-skills overlay directory
-                user_skill_dir = user_skills_dir / name
-                if user_skill_dir.exists():
-                    for notes_dirname in ["_notes", "notes"]:
-                        user_notes_dir = user_skill_dir / notes_dirname
-                        if user_notes_dir.exists() and user_notes_dir.is_dir():
-                            note_files.extend(
-                                [f for f in user_notes_dir.rglob("*") if f.is_file()]
-                            )
+        # Check skill's own notes directories
+        for notes_dirname in ["_notes", "notes"]:
+            notes_dir = skill_root / notes_dirname
+            if notes_dir.exists() and notes_dir.is_dir():
+                note_files.extend([f for f in notes_dir.rglob("*") if f.is_file()])
 
-                if note_files:
-                    # Sort all notes together
-                    note_files = sorted(note_files)
-                    notes_section = ["\n\n---\n\n# Notes\n"]
-                    notes_section.append(
-                        "\nThe following notes contain learnings, corrections, improvements, and examples discovered while using this skill:\n"
+        # Check user-skills overlay directory
+        user_skill_dir = user_skills_dir / name
+        if user_skill_dir.exists():
+            for notes_dirname in ["_notes", "notes"]:
+                user_notes_dir = user_skill_dir / notes_dirname
+                if user_notes_dir.exists() and user_notes_dir.is_dir():
+                    note_files.extend(
+                        [f for f in user_notes_dir.rglob("*") if f.is_file()]
                     )
-                    for note_file in note_files:
+
+        if note_files:
+            # Sort all notes together
+            note_files = sorted(note_files)
+            notes_section = ["\n\n---\n\n# Notes\n"]
+            notes_section.append(
+                "\nThe following notes contain learnings, corrections, improvements, and examples discovered while using this skill:\n"
+            )
+            for note_file in note_files:
+                try:
+                    note_content = note_file.read_text(encoding="utf-8")
+                    # Try to get relative path from skill root first, then user-skills root
+                    try:
+                        rel_path = note_file.relative_to(skill_root).as_posix()
+                    except ValueError:
                         try:
-                            note_content = note_file.read_text(encoding="utf-8")
-                            # Try to get relative path from skill root first, then user-skills root
-                            try:
-                                rel_path = note_file.relative_to(skill_root).as_posix()
-                            except ValueError:
-                                try:
-                                    rel_path = (
-                                        f"user-skills/{name}/"
-                                        + note_file.relative_to(
-                                            user_skill_dir
-                                        ).as_posix()
-                                    )
-                                except ValueError:
-                                    rel_path = note_file.name
-                            notes_section.append(
-                                f"\n## Note: {rel_path}\n\n{note_content}\n"
+                            rel_path = (
+                                f"user-skills/{name}/"
+                                + note_file.relative_to(user_skill_dir).as_posix()
                             )
-                        except Exception:
-                            # Skip notes that can't be read
-                            pass
-                    skill["body"] = skill.get("body", "") + "".join(notes_section)
-            return skill
-    raise ValueError(f"skill '{name}' not found")
+                        except ValueError:
+                            rel_path = note_file.name
+                    notes_section.append(f"\n## Note: {rel_path}\n\n{note_content}\n")
+                except Exception:
+                    # Skip notes that can't be read
+                    pass
+            skill["body"] = skill.get("body", "") + "".join(notes_section)
+    return skill
+
+
+_WORD_RE = re.compile(r"\w+")
+# Search index per skills_dir: (manifest, skills, query word -> skill indices, lowercased haystacks)
+_SEARCH_INDEX: dict[
+    Path,
+    tuple[
+        tuple[tuple[str, int, int], ...],
+        list[dict[str, Any]],
+        Callable[[str], frozenset[int]],
+        list[str],
+    ],
+] = {}
+# Lowercased haystack and token set per skill, keyed by (skills_dir, path). An entry stays
+# valid while the cached skill dict is the same object, i.e. until its SKILL.md is re-parsed.
+_HAYSTACKS: dict[tuple[Path, str], tuple[dict[str, Any], str, frozenset[str]]] = {}
+
+
+def _skill_haystack(
+    skills_dir: Path, skill: dict[str, Any]
+) -> tuple[str, frozenset[str]]:
+    """
+    function_purpose: Return the lowercased searchable text of a skill and its word tokens, computed once per parse.
+    """
+    key = (skills_dir, str(skill.get("path")))
+    cached = _HAYSTACKS.get(key)
+    if cached is not None and cached[0] is skill:
+        return cached[1], cached[2]
+    # Discovery only parses headers, so read the markdown body here
+    try:
+        body = load_skill_body(skills_dir / skill["path"])
+    except (OSError, ValueError):
+        body = ""
+    hay = f"{skill.get('name', '')}\n{skill.get('description', '')}\n{body}".lower()
+    tokens = frozenset(_WORD_RE.findall(hay))
+    _HAYSTACKS[key] = (skill, hay, tokens)
+    return hay, tokens
 
 
-def search_skills(skills_dir: Path, query: str) -> list[dict[str, Any]]:
+def _build_index(
+    skills_dir: Path, skills: list[dict[str, Any]]
+) -> tuple[dict[str, set[int]], list[str]]:
+    """
+    function_purpose: Build a token -> skill-index inverted index over name, description, and body.
+
+    Returns (postings, haystacks) where haystacks[i] is the lowercased searchable text of skills[i].
+    """
+    postings: dict[str, set[int]] = {}
+    haystacks: list[str] = []
+    for idx, s in enumerate(skills):
+        hay, tokens = _skill_haystack(skills_dir, s)
+        haystacks.append(hay)
+        for token in tokens:
+            postings.setdefault(token, set()).add(idx)
+
+    live = {str(s.get("path")) for s in skills}
+    for key in [k for k in _HAYSTACKS if k[0] == skills_dir and k[1] not in live]:
+        del _HAYSTACKS[key]
+    return postings, haystacks
+
+
+def _token_expander(postings: dict[str, set[int]]) -> Callable[[str], frozenset[int]]:
+    """
+    function_purpose: Build a memoized lookup of the skills whose indexed tokens contain a query word.
+
+    The vocabulary is joined into one newline-separated string, so each lookup is a few
+    str.find calls plus a bisect per hit instead of a Python loop over every token.
+    """
+    vocab = sorted(postings)
+    text = "\n".join(vocab)
+    starts: list[int] = []
+    offset = 0
+    for token in vocab:
+        starts.append(offset)
+        offset += len(token) + 1
+
+    @functools.lru_cache(maxsize=4096)
+    def expand(word: str) -> frozenset[int]:
+        matches: set[int] = set()
+        pos = text.find(word)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            matches |= postings[vocab[i]]
+            # Words never contain a newline, so skip straight to the next token
+            pos = text.find(word, starts[i] + len(vocab[i]) + 1)
+        return frozenset(matches)
+
+    return expand
+
+
+def _search_index(
+    skills_dir: Path,
+) -> tuple[list[dict[str, Any]], Callable[[str], frozenset[int]], list[str]]:
+    """
+    function_purpose: Return (skills, expand, haystacks) for skills_dir, rebuilding only when discovery changed.
+    """
+    with _DISCOVERY_LOCK:
+        skills = discover_skills(skills_dir)
+        manifest = _DISCOVERY_MANIFEST.get(skills_dir)
+        cached = _SEARCH_INDEX.get(skills_dir)
+        if cached is not None and cached[0] == manifest:
+            return cached[1], cached[2], cached[3]
+        postings, haystacks = _build_index(skills_dir, skills)
+        expand = _token_expander(postings)
+        if manifest is not None:
+            _SEARCH_INDEX[skills_dir] = (manifest, skills, expand, haystacks)
+        return skills, expand, haystacks
+
+
+def iter_search_skills(skills_dir: Path, query: str) -> Iterator[dict[str, Any]]:
     """
     function_purpose: Case-insensitive substring search across name, description, and body.
 
-    Returns brief matches with {name, description, path}.
+    Every word in the query must occur inside some indexed token of a matching skill, so the
+    inverted index narrows the candidates before the exact substring check.
+    Yields brief matches with {name, description, path} in discovery order.
     """
     q = (query or "").strip().lower()
-    results: list[dict[str, Any]] = []
     if not q:
-        return results
-    for s in discover_skills(skills_dir):
-        hay = "\n".join(
-            [
-                str(s.get("name", "")),
-                str(s.get("description", "")),
-                str(s.get("body", "")),
-            ]
-        ).lower()
-        if q in hay:
-            results.append(
-                {
-                    "name": s.get("name"),
-                    "description": s.get("description"),
-                    "path": s.get("path"),
-                }
-            )
-    return results
+        return
+    skills, expand, haystacks = _search_index(skills_dir)
+
+    candidates: frozenset[int] | None = None
+    for token in set(_WORD_RE.findall(q)):
+        matches = expand(token)
+        candidates = matches if candidates is None else candidates & matches
+        if not candidates:
+            return
+    if candidates is None:
+        # Query has no word characters; fall back to scanning every skill
+        candidates = frozenset(range(len(skills)))
+
+    for idx in sorted(candidates):
+        if q in haystacks[idx]:
+            s = skills[idx]
+            yield {
+                "name": s.get("name"),
+                "description": s.get("description"),
+                "path": s.get("path"),
+            }
+
+
+def search_skills(skills_dir: Path, query: str) -> list[dict[str, Any]]:
+    """
+    function_purpose: Materialized form of iter_search_skills for callers that need a list.
+    """
+    return list(iter_search_skills(skills_dir, query))
 
 
 def skill_dir_for_name(skills_dir: Path, name: str) -> Path:
     """
     function_purpose: Resolve the directory path for a skill by its name.
 
-    Parses SKILL.md entries to find the skill's folder reliably.
+    Skills normally live at skills_dir/<name>, so that SKILL.md is checked first (one stat
+    plus the cached header parse) and wins over nested duplicates. Otherwise the name is
+    looked up in the index maintained by discover_skills, or just the matching SKILL.md
+    files are parsed if skills_dir has not been discovered yet; invalid skills are not
+    resolvable.
     """
-    for md_path in iter_skill_md_paths(skills_dir):
+    with _DISCOVERY_LOCK:
+        if name and "/" not in name and os.sep not in name and name not in (".", ".."):
+            candidate = skills_dir / name
+            md_path = candidate / "SKILL.md"
+            try:
+                st = md_path.stat()
+                if stat.S_ISREG(st.st_mode):
+                    # Parsing succeeds only if the frontmatter name matches the
+                    # directory; the parse cache is pruned under the same lock
+                    _ = _parse_skill_md_cached(md_path, skills_dir, st)
+                    return candidate
+            except Exception:
+                pass
+        if skills_dir not in _DISCOVERY_MANIFEST:
+            skill = _find_skill_cold(skills_dir, name, valid_only=True)
+            if skill is None:
+                raise ValueError(f"skill '{name}' not found")
+            return (skills_dir / skill["path"]).parent
+        _ = discover_skills(skills_dir)
         try:
-            data = parse_skill_md(md_path, skills_dir)
-            if data.get("name") == name:
-                return md_path.parent
-        except Exception:
-            # Skip invalid while resolving
-            continue
-    raise ValueError(f"skill '{name}' not found")
+            return _NAME_TO_DIR[skills_dir][name]
+        except KeyError:
+            raise ValueError(f"skill '{name}' not found") from None
 
 
 def skill_dir_for_name_any(name: str) -> Path:
@@ -510,72 +1387,208 @@ def _is_anthropic_skill(skills_dir: Path, name: str) -> bool:
         return False
 
 
-def list_skill_assets(skills_dir: Path, name: str) -> list[dict[str, Any]]:
+# Upper bound on entries returned by list_skill_assets, and directories it never walks:
+# heavy tooling trees plus _notes, which skill_list_notes covers and which grows with every note.
+_MAX_ASSETS = 5000
+_SKIP_DIRS = frozenset({".git", "node_modules", ".venv", "__pycache__", "_notes"})
+
+
+def _scan_files(
+    root: Path, skip_dirs: frozenset[str] = _SKIP_DIRS
+) -> Iterator[tuple[str, os.stat_result | None]]:
+    """
+    function_purpose: Recursively yield (posix relative path, stat) for every file under root.
+
+    Uses an explicit os.scandir stack so file types come from the directory entries and each
+    file is stat'ed once. Symlinked directories and skip_dirs are not descended into; stat
+    is None if it fails.
+    """
+    stack: list[tuple[str, str]] = [(str(root), "")]
+    while stack:
+        dir_path, prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    rel = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs:
+                            stack.append((entry.path, rel + "/"))
+                    elif entry.is_file():
+                        try:
+                            st: os.stat_result | None = entry.stat()
+                        except OSError:
+                            st = None
+                        yield rel, st
+        except OSError:
+            continue
+
+
+def list_skill_assets(
+    skills_dir: Path, name: str, max_assets: int = _MAX_ASSETS
+) -> list[dict[str, Any]]:
     """
     function_purpose: Enumerate non-SKILL.md files within a skill directory and user-skills overlay.
 
     Returns dicts: {path, size, mime_type} with path relative to the skill folder.
     Includes assets from both the skill's directory and user-skills overlay.
+    Stops after max_assets entries and then appends a {"path": "...", "truncated": True}
+    sentinel so callers can tell the listing is incomplete.
     """
     sdir = skill_dir_for_name(skills_dir, name)
     user_skills_dir = _resolve_user_skills_dir()
     assets: list[dict[str, Any]] = []
+    truncated = False
 
     # Get assets from skill's own directory
-    for f in [p for p in sdir.rglob("*") if p.is_file()]:
-        if f.name == "SKILL.md":
+    for rel, st in _scan_files(sdir):
+        filename = rel.rpartition("/")[2]
+        if filename == "SKILL.md":
             continue
-        rel = f.relative_to(sdir).as_posix()
-        try:
-            size = f.stat().st_size
-        except OSError:
-            size = None
-        mime, _ = guess_type(f.name)
-        assets.append({"path": rel, "size": size, "mime_type": mime})
+        if len(assets) >= max_assets:
+            truncated = True
+            break
+        assets.append(
+            {
+                "path": rel,
+                "size": st.st_size if st is not None else None,
+                "mime_type": _guess_mime(filename),
+            }
+        )
 
     # Get assets from user-skills overlay
     user_skill_dir = user_skills_dir / name
-    if user_skill_dir.exists() and user_skill_dir.is_dir():
-        for f in [p for p in user_skill_dir.rglob("*") if p.is_file()]:
-            try:
-                rel = f"user-skills/{name}/" + f.relative_to(user_skill_dir).as_posix()
-            except ValueError:
-                rel = f.name
-            try:
-                size = f.stat().st_size
-            except OSError:
-                size = None
-            mime, _ = guess_type(f.name)
-            assets.append({"path": rel, "size": size, "mime_type": mime})
+    if not truncated and user_skill_dir.is_dir():
+        for rel, st in _scan_files(user_skill_dir):
+            if len(assets) >= max_assets:
+                truncated = True
+                break
+            assets.append(
+                {
+                    "path": f"user-skills/{name}/{rel}",
+                    "size": st.st_size if st is not None else None,
+                    "mime_type": _guess_mime(rel.rpartition("/")[2]),
+                }
+            )
+
+    assets.sort(key=operator.itemgetter("path"))
+    if truncated:
+        assets.append(
+            {"path": "...", "size": None, "mime_type": None, "truncated": True}
+        )
+    return assets
+
+
+@functools.lru_cache(maxsize=1024)
+def _mime_for_suffix(suffix: str) -> str | None:
+    """
+    function_purpose: Guess a MIME type from a (lowercased) file suffix, memoized per suffix.
+
+    Plain suffixes are answered from mimetypes.types_map; compound, aliased or encoded
+    ones ('.tar.gz', '.tgz', '.svgz') go through guess_type.
+    """
+    if not mimetypes.inited:
+        mimetypes.init()
+    mime = None
+    if (
+        suffix.count(".") == 1
+        and suffix not in mimetypes.suffix_map
+        and suffix not in mimetypes.encodings_map
+    ):
+        mime = mimetypes.types_map.get(suffix)
+    if mime is None:
+        mime, _ = mimetypes.guess_type("x" + suffix)
+    return mime
+
+
+def _guess_mime(filename: str) -> str | None:
+    """
+    function_purpose: Best-effort MIME type for a file name via the suffix cache.
+
+    Keys on the last two suffixes so compound extensions such as '.tar.gz' still resolve.
+    """
+    return _mime_for_suffix("".join(PurePath(filename).suffixes[-2:]).lower())
+
+
+# Bytes that occur in text files (the heuristic used by file(1)); any other byte marks binary data.
+_TEXT_CHARS = bytes({7, 8, 9, 10, 11, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+# Leading bytes inspected when sniffing for binary content.
+_SNIFF_BYTES = 4096
+# Non-text/* MIME types that are always treated as text.
+_TEXT_MIME: frozenset[str] = frozenset(
+    {
+        "application/json",
+        "application/xml",
+        "application/yaml",
+        "application/x-yaml",
+        "application/toml",
+        "application/javascript",
+    }
+)
 
-    assets.sort(key=lambda x: x["path"])
-    return assets
+
+def _is_text_mime(mime_type: str | None) -> bool:
+    """
+    function_purpose: Check whether a MIME type declares text content.
+    """
+    if not mime_type:
+        return False
+    return mime_type.startswith("text/") or mime_type in _TEXT_MIME
 
 
-def _is_text_data(data: bytes, mime_type: str | None) -> bool:
+def _is_text_data(
+    data: bytes | memoryview, mime_type: str | None, complete: bool = True
+) -> bool:
     """
     function_purpose: Determine if byte content should be treated as text.
 
-    Considers MIME type and UTF-8 decodability.
-    """
-    if mime_type and (
-        mime_type.startswith("text/")
-        or mime_type
-        in {
-            "application/json",
-            "application/xml",
-            "application/yaml",
-            "application/x-yaml",
-            "application/toml",
-            "application/javascript",
-        }
-    ):
+    Considers MIME type first. Otherwise the leading _SNIFF_BYTES must contain no control
+    bytes (checked with bytes.translate) and must decode as UTF-8, allowing for one
+    multibyte character cut off at the end of the window, or at the end of data when
+    complete=False (data is a truncated read). Only that window is examined;
+    read_skill_asset still decodes sniffed content strictly in full.
+    """
+    if _is_text_mime(mime_type):
         return True
+    head = bytes(data[:_SNIFF_BYTES])
+    if head.translate(None, _TEXT_CHARS):
+        return False
     try:
-        _ = data.decode("utf-8")
-        return True
+        _ = codecs.utf_8_decode(head, "strict", complete and len(data) <= _SNIFF_BYTES)
     except UnicodeDecodeError:
         return False
+    return True
+
+
+def _is_within(path_s: str, root_s: str) -> bool:
+    """
+    function_purpose: Check that a normalized path string is root_s itself or lies beneath it.
+    """
+    return path_s == root_s or path_s.startswith(root_s.rstrip(os.sep) + os.sep)
+
+
+@functools.lru_cache(maxsize=256)
+def _real_dir(dir_s: str) -> str:
+    """
+    function_purpose: Memoized os.path.realpath of a skill directory.
+    """
+    return os.path.realpath(dir_s)
+
+
+def _resolve_within(root: Path, rel_path: str) -> Path | None:
+    """
+    function_purpose: Resolve rel_path under root, returning None if it escapes root.
+
+    '..' traversal and absolute paths are rejected lexically before touching the filesystem.
+    The surviving path is still resolved so a symlink inside root cannot point outside it.
+    """
+    root_s = os.path.normpath(os.fspath(root))
+    full = os.path.normpath(os.path.join(root_s, rel_path))
+    if not _is_within(full, root_s):
+        return None
+    real = os.path.realpath(full)
+    if not _is_within(real, _real_dir(root_s)):
+        return None
+    return Path(real)
 
 
 def read_skill_asset(
@@ -600,55 +1613,87 @@ def read_skill_asset(
         user_skill_dir = user_skills_dir / name
         # Remove the "user-skills/{name}/" prefix
         user_rel_path = rel_path[len(f"user-skills/{name}/") :]
-        file_path = (user_skill_dir / user_rel_path).resolve()
 
         # Prevent path traversal
-        if user_skill_dir not in file_path.parents and file_path != user_skill_dir:
+        file_path = _resolve_within(user_skill_dir, user_rel_path)
+        if file_path is None:
             raise ValueError("path must be within the user-skills directory")
     else:
         # Regular skill asset
         sdir = skill_dir_for_name(skills_dir, name)
-        file_path = (sdir / rel_path).resolve()
 
         # Prevent path traversal
-        if sdir not in file_path.parents and file_path != sdir:
+        file_path = _resolve_within(sdir, rel_path)
+        if file_path is None:
             raise ValueError("path must be within the skill directory")
 
-    if not file_path.exists() or not file_path.is_file():
+    # Open first and check the descriptor instead of separate exists/is_file stats.
+    # O_NONBLOCK keeps a FIFO from blocking the open; it has no effect on regular files.
+    try:
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        raise ValueError(f"file not found: {rel_path}") from None
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode):
+        os.close(fd)
         raise ValueError(f"file not found: {rel_path}")
-
-    mime, _ = guess_type(file_path.name)
-    raw = file_path.read_bytes()
-    truncated = False
-    if len(raw) > max_bytes:
-        raw = raw[:max_bytes]
-        truncated = True
-
-    if _is_text_data(raw, mime):
-        data = raw.decode("utf-8", errors="replace")
+    with os.fdopen(fd, "rb") as fh:
+        # Read one byte past the limit so truncation is detected without pulling the
+        # rest of a large file off disk. Sizing the read from fstat keeps small files
+        # from allocating a max_bytes buffer; if more than st_size comes back (the file
+        # grew, or procfs-style st_size 0) keep reading up to the limit.
+        want = min(st.st_size, max_bytes) + 1
+        raw = fh.read(want)
+        if len(raw) == want and want <= max_bytes:
+            raw += fh.read(max_bytes + 1 - want)
+
+    mime = _guess_mime(file_path.name)
+    truncated = len(raw) > max_bytes
+    # Slice through a memoryview so truncation does not copy the kept bytes
+    view = memoryview(raw)[:max_bytes]
+
+    data: str | None = None
+    if _is_text_mime(mime):
+        # Declared text is always returned as text; invalid bytes become U+FFFD
+        data = str(view, "utf-8", "replace")
+    elif _is_text_data(view, None, complete=not truncated):
+        # The sniff only covers the leading bytes, so decode strictly and return content
+        # that is not valid UTF-8 as base64 rather than with replacement characters. A
+        # truncated read may stop inside a multibyte character; that tail is dropped.
+        try:
+            data, _ = codecs.utf_8_decode(view, "strict", not truncated)
+        except UnicodeDecodeError:
+            pass
+    if data is not None:
         return {
             "encoding": "text",
             "data": data,
             "mime_type": mime,
             "truncated": truncated,
         }
-    else:
-        b64 = base64.b64encode(raw).decode("ascii")
-        return {
-            "encoding": "base64",
-            "data": b64,
-            "mime_type": mime,
-            "truncated": truncated,
-        }
+    b64 = binascii.b2a_base64(view, newline=False).decode("ascii")
+    return {
+        "encoding": "base64",
+        "data": b64,
+        "mime_type": mime,
+        "truncated": truncated,
+    }
 
 
 # --- FastMCP server and tools ---
+@functools.lru_cache(maxsize=8)
+def _resolve_dir(env_dir: str | None, default: Path) -> Path:
+    """
+    function_purpose: Resolve an env-configured directory once per distinct setting (resolve() hits the filesystem).
+    """
+    return Path(env_dir).resolve() if env_dir else default
+
+
 def _resolve_skills_dir() -> Path:
     """
     function_purpose: Resolve skills directory from environment or default location.
     """
-    env_dir = os.environ.get("SKILLS_DIR")
-    return Path(env_dir).resolve() if env_dir else DEFAULT_SKILLS_DIR
+    return _resolve_dir(os.environ.get("SKILLS_DIR"), DEFAULT_SKILLS_DIR)
 
 
 def _resolve_user_skills_dir() -> Path:
@@ -657,8 +1702,7 @@ def _resolve_user_skills_dir() -> Path:
 
     This directory contains user-created notes and assets that overlay Anthropic skills.
     """
-    env_dir = os.environ.get("USER_SKILLS_DIR")
-    return Path(env_dir).resolve() if env_dir else DEFAULT_USER_SKILLS_DIR
+    return _resolve_dir(os.environ.get("USER_SKILLS_DIR"), DEFAULT_USER_SKILLS_DIR)
 
 
 def _server_description() -> str:
@@ -672,80 +1716,111 @@ def _server_description() -> str:
     )
 
 
-mcp = FastMCP(
-    SERVER_NAME,
-    instructions=(
-        "ClaudeSkills MCP Server\n"
-        "\n"
-        "Purpose:\n"
-        "- Expose Anthropic Claude Agent Skills located in the 'skills/' folder as MCP tools so agents can\n"
-        "  discover, search, and read skill guidance and assets programmatically.\n"
-        "\n"
-        "Why use it:\n"
-        "- Agents can list skills with descriptions and metadata\n"
-        "- Fetch full skill documents (frontmatter + markdown body)\n"
-        "- Search across skills (name, description, and markdown body)\n"
-        "- Enumerate and read skill assets safely with path traversal protection and size limits\n"
-        "- Automatically keep skills up to date via background git sync on startup\n"
-        "- When you discover corrections, better examples, or scripts, use store_skill_note(name, title, content)\n"
-        "  to append a note under the skill (additions only) so future improvements can be incorporated.\n"
-        "\n"
-        "Transports:\n"
-        "- STDIO by default (ideal for MCP clients that spawn a server process)\n"
-        "\n"
-        "Startup behavior:\n"
-        "- Background git sync of 'skills' directory: if it's a git repo, fetch/pull; otherwise shallow clone\n"
-        "  using SKILLS_GIT_URL (default https://github.com/anthropics/skills) and SKILLS_GIT_BRANCH (default 'main').\n"
-        "\n"
-        "Environment configuration:\n"
-        "- SKILLS_GIT_URL       : git URL for skills repo (default: https://github.com/anthropics/skills)\n"
-        "- SKILLS_GIT_BRANCH    : git branch to pull/clone (default: main)\n"
-        "- SKILLS_DIR           : override skills directory (default: <repo_root>/skills)\n"
-        "- LOG_FILE             : override rotating log file path (default: <repo_root>/logs/skills_mcp_server.log)\n"
-        "\n"
-        "Safety & limits:\n"
-        "- Asset reads reject path traversal and cap bytes via 'max_bytes' (default 8 MiB). Text vs binary detection\n"
-        "  uses MIME type and UTF-8 decodability; returns either text or base64 content.\n"
-        "\n"
-        "Exposed tools:\n"
-        "- skill_server_info(): server name, description, skills_dir, transport\n"
-        "- skill_list_all(markdown_output?): brief skill metadata (supports markdown output)\n"
-        "- skill_get_detail(name, include_notes?, markdown_output?): full skill with notes (supports markdown output)\n"
-        "- skill_search_index(query, markdown_output?): substring search across skills (supports markdown output)\n"
-        "- skill_list_assets(name, markdown_output?): non-SKILL.md files inside a skill (supports markdown output)\n"
-        "- skill_list_notes(name, markdown_output?): list notes for a skill (supports markdown output)\n"
-        "- skill_read_asset(name, path, max_bytes): read an asset within a skill (text/base64 + mime_type + truncated)\n"
-        "- skill_create(name, description, body?, license?, allowed_tools?, metadata?): create a new skill directory with SKILL.md\n"
-        "- skill_add_asset(name, path, content, encoding?, overwrite?): add a single asset file (text or base64) inside a skill\n"
-        "- skill_add_assets(name, assets, overwrite?): bulk add multiple asset files to a skill\n"
-        "- skill_store_note(name, title, content): append a note to a skill\n"
-        "- skill_trash_user_skill(name, force?): move user-created skill to trash\n"
-        "- skill_trash_user_asset(name, path): move user-created asset/note to trash\n"
-        "\n"
-        "Markdown Output:\n"
-        "- Many tools support optional 'markdown_output=True' parameter for readable formatted output.\n"
-        "- When enabled, returns formatted markdown string instead of JSON structure.\n"
-        "- Useful for better readability and token efficiency when presenting information to LLMs.\n"
-        "\n"
-        "Notes:\n"
-        "- Skills must adhere to Agent Skills Spec (SKILL.md with YAML frontmatter: name, description).\n"
-        "- Immediate directory name must match 'name' in frontmatter (e.g., document-skills/docx with name: docx).\n"
-        "- Invalid SKILL.md entries are surfaced with error diagnostics in metadata but do not stop discovery.\n"
-        "\n"
-        "Notes and Assets:\n"
-        "- skill_get_detail() includes notes by default; notes contain corrections, improvements, and asset documentation.\n"
-        "- Notes are appended to the skill body to provide complete context including learnings and examples.\n"
-        "- IMPORTANT: When adding assets via skill_add_asset/skill_add_assets, ALWAYS create a note documenting:\n"
-        "  * What the asset contains and its purpose\n"
-        "  * When and why an agent should load/use it\n"
-        "  * Any context or prerequisites needed to understand it\n"
-        "  * Example usage patterns if applicable\n"
-        "- This documentation practice ensures assets remain discoverable and usable over time.\n"
-    ),
+_INSTRUCTIONS = (
+    "ClaudeSkills MCP Server\n"
+    "\n"
+    "Purpose:\n"
+    "- Expose Anthropic Claude Agent Skills located in the 'skills/' folder as MCP tools so agents can\n"
+    "  discover, search, and read skill guidance and assets programmatically.\n"
+    "\n"
+    "Why use it:\n"
+    "- Agents can list skills with descriptions and metadata\n"
+    "- Fetch full skill documents (frontmatter + markdown body)\n"
+    "- Search across skills (name, description, and markdown body)\n"
+    "- Enumerate and read skill assets safely with path traversal protection and size limits\n"
+    "- Automatically keep skills up to date via background git sync on startup\n"
+    "- When you discover corrections, better examples, or scripts, use store_skill_note(name, title, content)\n"
+    "  to append a note under the skill (additions only) so future improvements can be incorporated.\n"
+    "\n"
+    "Transports:\n"
+    "- STDIO by default (ideal for MCP clients that spawn a server process)\n"
+    "\n"
+    "Startup behavior:\n"
+    "- Background git sync of 'skills' directory: if it's a git repo, fetch/pull; otherwise shallow clone\n"
+    "  using SKILLS_GIT_URL (default https://github.com/anthropics/skills) and SKILLS_GIT_BRANCH (default 'main').\n"
+    "\n"
+    "Environment configuration:\n"
+    "- SKILLS_GIT_URL       : git URL for skills repo (default: https://github.com/anthropics/skills)\n"
+    "- SKILLS_GIT_BRANCH    : git branch to pull/clone (default: main)\n"
+    "- SKILLS_DIR           : override skills directory (default: <repo_root>/skills)\n"
+    "- LOG_FILE             : override rotating log file path (default: <repo_root>/logs/skills_mcp_server.log)\n"
+    "\n"
+    "Safety & limits:\n"
+    "- Asset reads reject path traversal and cap bytes via 'max_bytes' (default 8 MiB). Text vs binary detection\n"
+    "  uses MIME type, then a control-byte and strict UTF-8 check; returns either text or base64 content.\n"
+    "\n"
+    "Exposed tools:\n"
+    "- skill_server_info(): server name, description, skills_dir, transport\n"
+    "- skill_list_all(markdown_output?): brief skill metadata (supports markdown output)\n"
+    "- skill_get_detail(name, include_notes?, markdown_output?): full skill with notes (supports markdown output)\n"
+    "- skill_search_index(query, markdown_output?): substring search across skills (supports markdown output)\n"
+    "- skill_list_assets(name, markdown_output?): non-SKILL.md files inside a skill (supports markdown output)\n"
+    "- skill_list_notes(name, markdown_output?): list notes for a skill (supports markdown output)\n"
+    "- skill_read_asset(name, path, max_bytes): read an asset within a skill (text/base64 + mime_type + truncated)\n"
+    "- skill_create(name, description, body?, license?, allowed_tools?, metadata?): create a new skill directory with SKILL.md\n"
+    "- skill_add_asset(name, path, content, encoding?, overwrite?): add a single asset file (text or base64) inside a skill\n"
+    "- skill_add_assets(name, assets, overwrite?): bulk add multiple asset files to a skill\n"
+    "- skill_store_note(name, title, content): append a note to a skill\n"
+    "- skill_trash_user_skill(name, force?): move user-created skill to trash\n"
+    "- skill_trash_user_asset(name, path): move user-created asset/note to trash\n"
+    "\n"
+    "Markdown Output:\n"
+    "- Many tools support optional 'markdown_output=True' parameter for readable formatted output.\n"
+    "- When enabled, returns formatted markdown string instead of JSON structure.\n"
+    "- Useful for better readability and token efficiency when presenting information to LLMs.\n"
+    "\n"
+    "Notes:\n"
+    "- Skills must adhere to Agent Skills Spec (SKILL.md with YAML frontmatter: name, description).\n"
+    "- Immediate directory name must match 'name' in frontmatter (e.g., document-skills/docx with name: docx).\n"
+    "- Invalid SKILL.md entries are surfaced with error diagnostics in metadata but do not stop discovery.\n"
+    "\n"
+    "Notes and Assets:\n"
+    "- skill_get_detail() includes notes by default; notes contain corrections, improvements, and asset documentation.\n"
+    "- Notes are appended to the skill body to provide complete context including learnings and examples.\n"
+    "- IMPORTANT: When adding assets via skill_add_asset/skill_add_assets, ALWAYS create a note documenting:\n"
+    "  * What the asset contains and its purpose\n"
+    "  * When and why an agent should load/use it\n"
+    "  * Any context or prerequisites needed to understand it\n"
+    "  * Example usage patterns if applicable\n"
+    "- This documentation practice ensures assets remain discoverable and usable over time.\n"
 )
 
+# Tools are collected here and registered on the FastMCP instance by _get_mcp(), so
+# CLI inspection never pays for importing fastmcp.
+_TOOLS: list[Callable[..., Any]] = []
+
+
+def _tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    function_purpose: Mark fn as an MCP tool; registration is deferred to _get_mcp().
+    """
+    _TOOLS.append(fn)
+    return fn
+
+
+@functools.cache
+def _get_mcp() -> FastMCP:
+    """
+    function_purpose: Import fastmcp and build the server with every collected tool, once.
+    """
+    from fastmcp import FastMCP
+
+    server = FastMCP(SERVER_NAME, instructions=_INSTRUCTIONS)
+    for fn in _TOOLS:
+        _ = server.tool(fn)
+    return server
 
-@mcp.tool
+
+def __getattr__(name: str) -> Any:
+    """
+    function_purpose: Keep `server.mcp` available for callers that import the FastMCP instance.
+    """
+    if name == "mcp":
+        return _get_mcp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@_tool
 def skill_server_info() -> dict[str, Any]:
     """
     function_purpose: Return server-level documentation including purpose and usage.
@@ -772,8 +1847,8 @@ def skill_server_info() -> dict[str, Any]:
     }
 
 
-@mcp.tool
-def skill_list_all(markdown_output: bool = False) -> list[dict[str, Any]] | str:
+@_tool
+async def skill_list_all(markdown_output: bool = False) -> list[dict[str, Any]] | str:
     """
     function_purpose: List available skills with brief metadata (excluding body).
 
@@ -792,30 +1867,20 @@ def skill_list_all(markdown_output: bool = False) -> list[dict[str, Any]] | str:
     - Use this to present a catalog of available skills to the agent or user.
     - Set markdown_output=True for a more readable format.
     """
-    # Discover skills from both bundled and user-skills directories
-    skills_dir = _resolve_skills_dir()
-    bundled_skills = discover_skills(skills_dir)
-
-    user_skills_dir = _resolve_user_skills_dir()
-    user_skills = discover_skills(user_skills_dir)
+    # Discover skills from both bundled and user-skills directories, concurrently and
+    # off the event loop since cold discovery reads and parses files
+    bundled_skills, user_skills = await asyncio.gather(
+        asyncio.to_thread(discover_skill_briefs, _resolve_skills_dir()),
+        asyncio.to_thread(discover_skill_briefs, _resolve_user_skills_dir()),
+    )
 
     # Combine, with user skills potentially overriding bundled ones by name
     skills_by_name = {s["name"]: s for s in bundled_skills}
     for s in user_skills:
         skills_by_name[s["name"]] = s  # User skills take precedence
 
-    skills = list(skills_by_name.values())
-    skills.sort(key=lambda s: (s.get("name") or "", s.get("path") or ""))
-
-    skill_list = [
-        {
-            k: v
-            for k, v in s.items()
-            if k
-            in {"name", "description", "license", "allowed_tools", "metadata", "path"}
-        }
-        for s in skills
-    ]
+    skill_list = list(skills_by_name.values())
+    skill_list.sort(key=lambda s: (s.get("name") or "", s.get("path") or ""))
 
     if not markdown_output:
         return skill_list
@@ -836,8 +1901,8 @@ def skill_list_all(markdown_output: bool = False) -> list[dict[str, Any]] | str:
     return "".join(lines)
 
 
-@mcp.tool
-def skill_get_detail(
+@_tool
+async def skill_get_detail(
     name: str, include_notes: bool = True, markdown_output: bool = False
 ) -> dict[str, Any] | str:
     """
@@ -864,7 +1929,9 @@ def skill_get_detail(
     - Set markdown_output=True to get a readable markdown document instead of JSON structure.
     """
     skills_dir = _resolve_skills_dir()
-    skill = get_skill(skills_dir, name, include_notes=include_notes)
+    skill = await asyncio.to_thread(
+        get_skill, skills_dir, name, include_notes=include_notes
+    )
 
     if not markdown_output:
         return skill
@@ -889,8 +1956,8 @@ def skill_get_detail(
     return "".join(lines)
 
 
-@mcp.tool
-def skill_search_index(
+@_tool
+async def skill_search_index(
     query: str, markdown_output: bool = False
 ) -> list[dict[str, Any]] | str:
     """
@@ -912,7 +1979,7 @@ def skill_search_index(
     - Set markdown_output=True for a more readable format.
     """
     skills_dir = _resolve_skills_dir()
-    results = search_skills(skills_dir, query)
+    results = await asyncio.to_thread(search_skills, skills_dir, query)
 
     if not markdown_output:
         return results
@@ -932,8 +1999,8 @@ def skill_search_index(
     return "".join(lines)
 
 
-@mcp.tool
-def skill_list_assets(
+@_tool
+async def skill_list_assets(
     name: str, markdown_output: bool = False
 ) -> list[dict[str, Any]] | str:
     """
@@ -941,6 +2008,8 @@ def skill_list_assets(
 
     Description:
     - Enumerates files inside a specific skill directory, excluding SKILL.md, recursively.
+    - Skips _notes (see skill_list_notes), .git, node_modules, .venv and __pycache__;
+      listings over 5000 files end with a {"path": "...", "truncated": true} entry.
     - Useful for discovering supporting artifacts, reference materials, templates, and helper scripts that belong to a skill.
 
     Args:
@@ -957,7 +2026,7 @@ def skill_list_assets(
     - Set markdown_output=True for a more readable format.
     """
     skills_dir = _resolve_skills_dir()
-    assets = list_skill_assets(skills_dir, name)
+    assets = await asyncio.to_thread(list_skill_assets, skills_dir, name)
 
     if not markdown_output:
         return assets
@@ -980,8 +2049,8 @@ def skill_list_assets(
     return "".join(lines)
 
 
-@mcp.tool
-def skill_read_asset(
+@_tool
+async def skill_read_asset(
     name: str, path: str, max_bytes: int = 8_388_608
 ) -> dict[str, Any]:
     """
@@ -1008,10 +2077,10 @@ def skill_read_asset(
     - If the asset is large, consider increasing max_bytes or reading only required portions.
     """
     skills_dir = _resolve_skills_dir()
-    return read_skill_asset(skills_dir, name, path, max_bytes)
+    return await asyncio.to_thread(read_skill_asset, skills_dir, name, path, max_bytes)
 
 
-@mcp.tool
+@_tool
 def skill_create(
     name: str,
     description: str,
@@ -1071,38 +2140,47 @@ def skill_create(
     if sdir.exists() or (bundled_skills_dir / name).exists():
         return {"created": False, "path": "", "message": "Skill already exists"}
 
+    # Emit the frontmatter with a real YAML dumper so quotes, colons and nested
+    # metadata round-trip; keys follow the Agent Skills Spec ("allowed-tools").
+    # Built before the directory exists so unrepresentable metadata leaves nothing behind.
+    fm_data: dict[str, Any] = {"name": name, "description": description}
+    if license:
+        fm_data["license"] = license
+    if allowed_tools:
+        fm_data["allowed-tools"] = list(allowed_tools)
+    if metadata:
+        fm_data["metadata"] = metadata
     try:
-        sdir.mkdir(parents=True, exist_ok=False)
+        fm_text = yaml.dump(
+            fm_data,
+            Dumper=_YamlDumper,
+            sort_keys=False,
+            allow_unicode=True,
+            default_flow_style=False,
+            width=1 << 16,
+        )
     except Exception as exc:
         return {
             "created": False,
             "path": "",
-            "message": f"Failed to create directory: {exc}",
+            "message": f"Invalid frontmatter: {exc}",
         }
-
-    # Prepare frontmatter lines
-    fm_lines = ["---", f'name: "{name}"', f'description: "{description}"']
-    if license:
-        fm_lines.append(f'license: "{license}"')
-    if allowed_tools:
-        # Simple YAML list
-        fm_lines.append("allowed_tools:")
-        for t in allowed_tools:
-            fm_lines.append(f"  - {t}")
-    if metadata:
-        fm_lines.append("metadata:")
-        for k, v in metadata.items():
-            fm_lines.append(
-                f"  {k}: {v!r}".replace("\\'", "'")
-            )  # crude repr -> YAML-ish
-    fm_lines.append("---")
-    fm = "\n".join(fm_lines)
+    fm = "---\n" + fm_text + "---"
 
     content_body = body.strip()
     if not content_body:
         content_body = f"# {name}\n\n{description}\n\n(Placeholder body – update with detailed guidance.)"
     skill_md = fm + "\n\n" + content_body.rstrip() + "\n"
 
+    try:
+        sdir.mkdir(parents=True, exist_ok=False)
+    except Exception as exc:
+        return {
+            "created": False,
+            "path": "",
+            "message": f"Failed to create directory: {exc}",
+        }
+
     skill_path = sdir / "SKILL.md"
     try:
         with open(skill_path, "x", encoding="utf-8") as f:
@@ -1118,14 +2196,95 @@ def skill_create(
     return {"created": True, "path": rel, "message": "Skill created"}
 
 
+def _b64decode(
+    data: str | bytes | bytearray | memoryview, validate: bool = False
+) -> bytes:
+    """
+    function_purpose: Decode base64 with pybase64 when installed, else the stdlib codec.
+
+    By default both skip characters outside the alphabet (such as line breaks); with
+    validate=True they reject them. Malformed input raises binascii.Error.
+    """
+    if _pybase64 is not None:
+        return _pybase64.b64decode(data, validate=validate)
+    return base64.b64decode(data, validate=validate)
+
+
+# Base64 characters decoded per slice when streaming an upload to disk (a multiple of 4)
+_B64_CHUNK = 4 * 1024 * 1024
+
+
+def _write_b64_file(target: Path, content: str | bytes | bytearray) -> int:
+    """
+    function_purpose: Decode base64 content into target slice by slice and return the bytes written.
+
+    Large payloads are decoded in _B64_CHUNK slices so the whole decoded blob never sits in
+    memory. Slicing only lines up with base64 groups when the input has no whitespace or
+    stray characters, so slices are decoded strictly; if one is rejected the payload falls
+    back to a single lenient decode of the whole payload. Smaller payloads are likewise
+    decoded strictly first and leniently only when that fails. Both in-memory attempts
+    finish before any file is opened, and target is only ever replaced by a fully decoded
+    file, so malformed input never truncates an existing asset.
+    """
+    data = memoryview(content) if not isinstance(content, str) else content
+    if len(data) > _B64_CHUNK and len(data) % 4 == 0:
+
+        def write_slices(f: io.BufferedWriter) -> int:
+            size = 0
+            for start in range(0, len(data), _B64_CHUNK):
+                chunk = data[start : start + _B64_CHUNK]
+                size += f.write(_b64decode(chunk, validate=True))
+            return size
+
+        try:
+            return _replace_file(target, write_slices)
+        except binascii.Error:
+            pass
+    try:
+        # Strict decoding is pybase64's fast SIMD path; wrapped input falls back
+        raw = _b64decode(data, validate=True)
+    except binascii.Error:
+        raw = _b64decode(data)
+    return _replace_file(target, lambda f: f.write(raw))
+
+
+def _replace_file(target: Path, write: Callable[[io.BufferedWriter], int]) -> int:
+    """
+    function_purpose: Fill a temporary sibling of target via write, then move it onto target.
+
+    If write raises, the temporary file is removed and target is left untouched. The file
+    is created with open() rather than mkstemp so it gets the usual umask-derived mode.
+    Returns what write returned.
+    """
+    tmp = target.with_name(f".{target.name}.{os.urandom(4).hex()}.tmp")
+    try:
+        with open(tmp, "xb") as f:
+            size = write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return size
+
+
 def _add_skill_asset_impl(
     name: str,
     path: str,
-    content: str,
+    content: str | bytes | bytearray,
     encoding: str = "text",
     overwrite: bool = False,
+    made_dirs: set[Path] | None = None,
 ) -> dict[str, Any]:
-    """Internal implementation for adding skill assets."""
+    """Internal implementation for adding skill assets.
+
+    With encoding="base64", content may also be ASCII bytes, which are decoded without
+    first being copied into a str. Bulk callers pass a shared made_dirs set so each
+    parent directory is created once per batch instead of once per file.
+    """
+    binary = encoding == "base64"
     try:
         skill_root = skill_dir_for_name_any(name)
     except ValueError:
@@ -1134,7 +2293,7 @@ def _add_skill_asset_impl(
             "path": path,
             "size": None,
             "message": f"skill '{name}' not found",
-            "binary": encoding == "base64",
+            "binary": binary,
         }
 
     if not path or path.startswith("/") or ".." in path:
@@ -1143,26 +2302,19 @@ def _add_skill_asset_impl(
             "path": path,
             "size": None,
             "message": "Invalid path",
-            "binary": encoding == "base64",
+            "binary": binary,
         }
 
-    target = (skill_root / path).resolve()
-    try:
-        if not str(target).startswith(str(skill_root.resolve())):
-            return {
-                "written": False,
-                "path": path,
-                "size": None,
-                "message": "Path traversal detected",
-                "binary": encoding == "base64",
-            }
-    except Exception:
+    # Same containment check as read_skill_asset: a plain string prefix test would also
+    # accept sibling directories such as '<skill>-other' reached through a symlink
+    target = _resolve_within(skill_root, path)
+    if target is None:
         return {
             "written": False,
             "path": path,
             "size": None,
-            "message": "Path resolution failed",
-            "binary": encoding == "base64",
+            "message": "Path traversal detected",
+            "binary": binary,
         }
 
     if target.exists() and not overwrite:
@@ -1171,22 +2323,27 @@ def _add_skill_asset_impl(
             "path": path,
             "size": None,
             "message": "File exists (set overwrite=True to replace)",
-            "binary": encoding == "base64",
+            "binary": binary,
         }
 
-    target.parent.mkdir(parents=True, exist_ok=True)
+    if made_dirs is None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        # skill_add_assets may share made_dirs between writer threads
+        with _MADE_DIRS_LOCK:
+            if target.parent not in made_dirs:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(target.parent)
 
-    binary = encoding == "base64"
     try:
         if binary:
-            raw = base64.b64decode(content)
-            with open(target, "wb") as f:
-                _ = f.write(raw)
-            size = len(raw)
+            size = _write_b64_file(target, content)
         else:
-            with open(target, "w", encoding="utf-8") as f:
-                _ = f.write(content)
-            size = target.stat().st_size
+            # The encoded length is the file size, so no stat after the write
+            data = content.encode("utf-8")
+            with open(target, "wb") as f:
+                _ = f.write(data)
+            size = len(data)
     except Exception as exc:
         return {
             "written": False,
@@ -1198,14 +2355,14 @@ def _add_skill_asset_impl(
 
     return {
         "written": True,
-        "path": str(target.relative_to(skill_root)),
+        "path": os.path.normpath(path),
         "size": size,
         "message": "Asset written",
         "binary": binary,
     }
 
 
-@mcp.tool
+@_tool
 def skill_add_asset(
     name: str,
     path: str,
@@ -1247,7 +2404,15 @@ def skill_add_asset(
     return _add_skill_asset_impl(name, path, content, encoding, overwrite)
 
 
-@mcp.tool
+# Content types skill_add_assets accepts for base64 entries; in-process callers may pass
+# the payload as bytes
+_B64_CONTENT_TYPES = (str, bytes, bytearray)
+# Smallest skill_add_assets batch written on a thread pool
+_PARALLEL_WRITE_MIN = 4
+_MADE_DIRS_LOCK = threading.Lock()
+
+
+@_tool
 def skill_add_assets(
     name: str,
     assets: list[dict[str, Any]],
@@ -1269,32 +2434,88 @@ def skill_add_assets(
     Args:
     - name: str                   Skill name
     - assets: list[dict]          Each: {path: str, content: str, encoding?: "text"|"base64"}
+                                  (in-process callers may pass base64 content as bytes)
     - overwrite: bool             Allow overwriting existing files
 
     Returns:
     - list of result dicts (see add_skill_asset).
     """
-    results: list[dict[str, Any]] = []
+    results: list[dict[str, Any] | None] = []
+    # (result index, path, content, encoding) of the entries that passed validation
+    jobs: list[tuple[int, str, str | bytes | bytearray, str]] = []
     for entry in assets:
-        p = entry.get("path")
-        c = entry.get("content", "")
-        enc = entry.get("encoding", "text")
-        if not isinstance(p, str) or not isinstance(c, str):
+        if isinstance(entry, dict):
+            p = entry.get("path")
+            c = entry.get("content", "")
+            enc = entry.get("encoding", "text")
+        else:
+            # Non-mapping entries are reported like any other malformed entry
+            p, c, enc = None, None, "text"
+        binary = enc == "base64"
+        content_types = _B64_CONTENT_TYPES if binary else str
+        if not isinstance(p, str) or not isinstance(c, content_types):
             results.append(
                 {
                     "written": False,
                     "path": p or "",
                     "size": None,
                     "message": "Invalid asset entry",
-                    "binary": enc == "base64",
+                    "binary": binary,
                 }
             )
             continue
-        results.append(_add_skill_asset_impl(name, p, c, enc, overwrite))
-    return results
+        jobs.append((len(results), p, c, enc))
+        results.append(None)
+
+    made_dirs: set[Path] = set()
+
+    def write(job: tuple[int, str, str | bytes | bytearray, str]) -> None:
+        idx, p, c, enc = job
+        results[idx] = _add_skill_asset_impl(name, p, c, enc, overwrite, made_dirs)
+
+    # Writes release the GIL, so larger batches overlap their file I/O on a few threads.
+    # Batches that name the same path twice stay serial so "File exists" and overwrite
+    # outcomes remain in request order.
+    distinct = len({os.path.normpath(job[1]) for job in jobs}) == len(jobs)
+    if len(jobs) >= _PARALLEL_WRITE_MIN and distinct:
+        with ThreadPoolExecutor(
+            max_workers=min(8, len(jobs)), thread_name_prefix="SkillAssetWrite"
+        ) as executor:
+            for _ in executor.map(write, jobs):
+                pass
+    else:
+        for job in jobs:
+            write(job)
+    return [r for r in results if r is not None]
+
+
+def _file_timestamp() -> str:
+    """
+    function_purpose: Local time with UTC offset for note and trash file names, e.g. 20250101T120000+0100.
+
+    Formats a time.struct_time directly instead of building a datetime object.
+    """
+    return time.strftime("%Y%m%dT%H%M%S%z", time.localtime())
+
+
+# Note filename slugs: punctuation is dropped, runs of spaces/dashes/underscores become one '-'.
+_SLUG_DROP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SEP_RE = re.compile(r"[\s_-]+")
+
+
+def _slugify(text: str) -> str:
+    """
+    function_purpose: Turn a note title into a filename-safe slug, keeping unicode letters and digits.
+    """
+    slug = _SLUG_SEP_RE.sub("-", _SLUG_DROP_RE.sub("", text.strip().lower()))
+    return slug.strip("-") or "note"
+
+
+# Frontmatter written by skill_store_note; _fast_note_frontmatter reads it back
+_NOTE_TMPL = '---\ntitle: "{title}"\ncreated_at: {ts}\nkind: note\n---\n{body}\n'
 
 
-@mcp.tool
+@_tool
 def skill_store_note(name: str, title: str, content: str) -> dict[str, Any]:
     """
     function_purpose: Append a new note to a skill capturing learnings, improvements, and scripts.
@@ -1332,21 +2553,9 @@ def skill_store_note(name: str, title: str, content: str) -> dict[str, Any]:
     notes_dir = sdir / "_notes"
     notes_dir.mkdir(parents=True, exist_ok=True)
 
-    # Simple slugification for filename safety
-    def _slugify(text: str) -> str:
-        cleaned = []
-        for ch in text.strip():
-            if ch.isalnum():
-                cleaned.append(ch.lower())
-            elif ch in (" ", "-", "_"):
-                cleaned.append("-")
-            else:
-                cleaned.append("")
-        slug = "".join(cleaned).strip("-")
-        return slug or "note"
-
-    ts = datetime.now().astimezone().strftime("%Y%m%dT%H%M%S%z")
+    ts = _file_timestamp()
     slug = _slugify(title)[:80]
+    # The slug holds no path separators, so the relative path is a plain join
     filename = f"{ts}-{slug}.md"
     note_path = notes_dir / filename
 
@@ -1365,34 +2574,116 @@ def skill_store_note(name: str, title: str, content: str) -> dict[str, Any]:
                 # No closing ---, treat as regular content
                 pass
 
-    # Exclusive create to prevent overwrites
-    fm = [
-        "---",
-        f'title: "{title}"',
-        f"created_at: {ts}",
-        "kind: note",
-        "---",
-        "",
-    ]
-    body = "\n".join(fm) + content_stripped.rstrip() + "\n"
+    note = _NOTE_TMPL.format(
+        title=title, ts=ts, body=content_stripped.rstrip()
+    ).encode("utf-8")
 
+    # Exclusive create (O_EXCL) to prevent overwrites; bytes skip the text-mode layer
     try:
-        with open(note_path, "x", encoding="utf-8") as f:
-            _ = f.write(body)
-        rel = note_path.relative_to(sdir).as_posix()
-        return {"path": rel, "created": True, "message": "Note stored"}
+        with open(note_path, "xb") as f:
+            _ = f.write(note)
+        return {"path": f"_notes/{filename}", "created": True, "message": "Note stored"}
     except FileExistsError:
         # Extremely unlikely due to timestamp; retry with suffix
-        alt = notes_dir / f"{ts}-{slug}-1.md"
-        with open(alt, "x", encoding="utf-8") as f:
-            _ = f.write(body)
-        rel = alt.relative_to(sdir).as_posix()
-        return {"path": rel, "created": True, "message": "Note stored (with suffix)"}
+        filename = f"{ts}-{slug}-1.md"
+        with open(notes_dir / filename, "xb") as f:
+            _ = f.write(note)
+        return {
+            "path": f"_notes/{filename}",
+            "created": True,
+            "message": "Note stored (with suffix)",
+        }
     except Exception as exc:
         return {"path": "", "created": False, "message": f"Failed to store note: {exc}"}
 
 
-@mcp.tool
+_NOTE_KEYS = ("title", "created_at", "kind")
+# skill_store_note timestamps, e.g. 20250101T120000+0100; YAML resolves these to strings
+_NOTE_TS_RE = re.compile(r"\d{8}T\d{6}(?:[+-]\d{4}|Z)?")
+
+
+def _fast_note_frontmatter(fm_lines: list[str]) -> dict[str, str] | None:
+    """
+    function_purpose: Parse the flat 'key: value' frontmatter skill_store_note writes without PyYAML.
+
+    Only title/created_at/kind with unambiguous string scalars are accepted; anything
+    else returns None so the caller falls back to YAML.
+    """
+    fm: dict[str, str] = {}
+    for line in fm_lines:
+        if not line.strip():
+            continue
+        key, sep, raw = line.partition(":")
+        if not sep or key not in _NOTE_KEYS or key in fm:
+            return None
+        raw = raw.strip()
+        if key == "created_at" and _NOTE_TS_RE.fullmatch(raw):
+            value: str | None = raw
+        else:
+            value = _fast_scalar(raw)
+        if value is None:
+            return None
+        fm[key] = value
+    return fm
+
+
+def _note_frontmatter_lines(lines: list[str]) -> list[str] | None:
+    """
+    function_purpose: Return the lines between a leading '---' and the next '---', or None if not closed.
+    """
+    if not lines or lines[0].strip() != "---":
+        return None
+    for idx in range(1, len(lines)):
+        if lines[idx].strip() == "---":
+            return lines[1:idx]
+    return None
+
+
+# Notes are read up to this many bytes to find their frontmatter; the rest is only read
+# when the frontmatter does not close within the head
+_NOTE_HEAD_BYTES = 4096
+
+
+def _note_meta(note_path: Path) -> tuple[str | None, str | None, str | None]:
+    """
+    function_purpose: Best-effort (title, created_at, kind) from a note's frontmatter.
+
+    Missing frontmatter, unreadable files and non-string values all yield None fields.
+    """
+    try:
+        with open(note_path, "rb") as fh:
+            head = fh.read(_NOTE_HEAD_BYTES)
+            complete = len(head) < _NOTE_HEAD_BYTES
+            if not complete:
+                # Keep whole lines so a multi-byte character is never split
+                head = head[: head.rfind(b"\n") + 1]
+            lines = head.decode("utf-8").splitlines()
+            fm_lines = _note_frontmatter_lines(lines)
+            if fm_lines is None and not complete:
+                if lines and lines[0].strip() != "---":
+                    return None, None, None
+                _ = fh.seek(0)
+                lines = fh.read().decode("utf-8").splitlines()
+                fm_lines = _note_frontmatter_lines(lines)
+        if fm_lines is None:
+            return None, None, None
+        fm: Any = _fast_note_frontmatter(fm_lines)
+        if fm is None:
+            fm = yaml.load("\n".join(fm_lines), Loader=_YamlLoader) or {}
+    except Exception:
+        # Ignore parsing errors; the note is still listed
+        return None, None, None
+    if not isinstance(fm, dict):
+        return None, None, None
+    t, ca, k = (fm.get(key) for key in _NOTE_KEYS)
+    return (
+        t if isinstance(t, str) else None,
+        ca if isinstance(ca, str) else None,
+        k if isinstance(k, str) else None,
+    )
+
+
+@_tool
 def skill_list_notes(
     name: str, markdown_output: bool = False
 ) -> list[dict[str, Any]] | str:
@@ -1431,46 +2722,13 @@ def skill_list_notes(
             continue
         found_any = True
 
-        for f in notes_dir.rglob("*"):
-            if not f.is_file():
-                continue
-            rel = f.relative_to(sdir).as_posix()
-            try:
-                size = f.stat().st_size
-            except OSError:
-                size = None
-
-            title: str | None = None
-            created_at: str | None = None
-            kind: str | None = None
-
-            # Best-effort parse of YAML frontmatter if present
-            try:
-                txt = f.read_text(encoding="utf-8")
-                lines = txt.splitlines(keepends=False)
-                if lines and lines[0].strip() == "---":
-                    fm_lines: list[str] = []
-                    idx = 1
-                    while idx < len(lines) and lines[idx].strip() != "---":
-                        fm_lines.append(lines[idx])
-                        idx += 1
-                    if idx < len(lines) and lines[idx].strip() == "---":
-                        fm = yaml.safe_load("\n".join(fm_lines)) or {}
-                        if isinstance(fm, dict):
-                            t = fm.get("title")
-                            ca = fm.get("created_at")
-                            k = fm.get("kind")
-                            title = t if isinstance(t, str) else None
-                            created_at = ca if isinstance(ca, str) else None
-                            kind = k if isinstance(k, str) else None
-            except Exception:
-                # Ignore parsing errors; still include the file in results
-                pass
+        for rel, st in _scan_files(notes_dir, frozenset()):
+            title, created_at, kind = _note_meta(notes_dir / rel)
 
             results.append(
                 {
-                    "path": rel,
-                    "size": size,
+                    "path": f"{notes_dirname}/{rel}",
+                    "size": st.st_size if st is not None else None,
                     "title": title,
                     "created_at": created_at,
                     "kind": kind,
@@ -1486,52 +2744,13 @@ def skill_list_notes(
                 continue
             found_any = True
 
-            for f in user_notes_dir.rglob("*"):
-                if not f.is_file():
-                    continue
-                try:
-                    rel_path = (
-                        f"user-skills/{name}/"
-                        + f.relative_to(user_skill_dir).as_posix()
-                    )
-                except ValueError:
-                    rel_path = f.name
-                try:
-                    size = f.stat().st_size
-                except OSError:
-                    size = None
-
-                title: str | None = None
-                created_at: str | None = None
-                kind: str | None = None
-
-                # Best-effort parse of YAML frontmatter if present
-                try:
-                    txt = f.read_text(encoding="utf-8")
-                    lines = txt.splitlines(keepends=False)
-                    if lines and lines[0].strip() == "---":
-                        fm_lines: list[str] = []
-                        idx = 1
-                        while idx < len(lines) and lines[idx].strip() != "---":
-                            fm_lines.append(lines[idx])
-                            idx += 1
-                        if idx < len(lines) and lines[idx].strip() == "---":
-                            fm = yaml.safe_load("\n".join(fm_lines)) or {}
-                            if isinstance(fm, dict):
-                                t = fm.get("title")
-                                ca = fm.get("created_at")
-                                k = fm.get("kind")
-                                title = t if isinstance(t, str) else None
-                                created_at = ca if isinstance(ca, str) else None
-                                kind = k if isinstance(k, str) else None
-                except Exception:
-                    # Ignore parsing errors; still include the file in results
-                    pass
+            for rel, st in _scan_files(user_notes_dir, frozenset()):
+                title, created_at, kind = _note_meta(user_notes_dir / rel)
 
                 results.append(
                     {
-                        "path": rel_path,
-                        "size": size,
+                        "path": f"user-skills/{name}/{notes_dirname}/{rel}",
+                        "size": st.st_size if st is not None else None,
                         "title": title,
                         "created_at": created_at,
                         "kind": kind,
@@ -1544,7 +2763,8 @@ def skill_list_notes(
         return results
 
     # Stable ordering by path
-    results.sort(key=lambda x: x.get("path") or "")
+    # Every entry has a str path, so the C-level itemgetter can key the sort
+    results.sort(key=operator.itemgetter("path"))
 
     if not markdown_output:
         return results
@@ -1568,7 +2788,7 @@ def skill_list_notes(
     return "".join(lines)
 
 
-@mcp.tool
+@_tool
 def skill_trash_user_skill(name: str, force: bool = True) -> dict[str, Any]:
     """
     function_purpose: Move a user-created skill directory into a trash location instead of hard deleting it.
@@ -1624,7 +2844,7 @@ def skill_trash_user_skill(name: str, force: bool = True) -> dict[str, Any]:
             "message": "Set force=True to move skill to trash",
         }
 
-    ts = datetime.now().astimezone().strftime("%Y%m%dT%H%M%S%z")
+    ts = _file_timestamp()
     trash_root = trash_dir / "skills"
     trash_root.mkdir(parents=True, exist_ok=True)
     trash_target = trash_root / f"{ts}__{name}"
@@ -1656,7 +2876,7 @@ def skill_trash_user_skill(name: str, force: bool = True) -> dict[str, Any]:
     }
 
 
-@mcp.tool
+@_tool
 def skill_trash_user_asset(name: str, path: str) -> dict[str, Any]:
     """
     function_purpose: Move a user-created asset or note into trash instead of deleting it.
@@ -1786,7 +3006,7 @@ def skill_trash_user_asset(name: str, path: str) -> dict[str, Any]:
             }
 
     # Compute trash target path.
-    ts = datetime.now().astimezone().strftime("%Y%m%dT%H%M%S%z")
+    ts = _file_timestamp()
     trash_root = trash_dir / "assets" / name
     trash_root.mkdir(parents=True, exist_ok=True)
     safe_rel = rel_from_root.replace("/", "__")
@@ -1856,22 +3076,135 @@ def run() -> None:
     skills_dir = _resolve_skills_dir()
     logger.info("Server starting with skills_dir=%s", str(skills_dir))
     start_background_git_sync(skills_dir, logger)
-    mcp.run()  # stdio transport by default
+    _get_mcp().run()  # stdio transport by default
 
 
-def cli_main() -> None:
+def _json_default(value: Any) -> str:
     """
-    function_purpose: CLI for inspecting skills without starting the MCP server.
+    function_purpose: Stringify values JSON cannot encode; dates use ISO 8601 like orjson does natively.
+    """
+    isoformat = getattr(value, "isoformat", None)
+    return isoformat() if callable(isoformat) else str(value)
 
-    Usage:
-      python -m skills_mcp.server --list
-      python -m skills_mcp.server --detail <NAME>
-      python -m skills_mcp.server --search "<QUERY>"
-      python -m skills_mcp.server --assets <NAME>
-      python -m skills_mcp.server --read <NAME> <PATH> [--max-bytes N]
+
+def _emit(obj: Any) -> None:
     """
-    logger = configure_logging()
-    skills_dir = _resolve_skills_dir()
+    function_purpose: Write obj to stdout as indented UTF-8 JSON, using orjson when installed.
+
+    Values JSON has no type for (YAML dates in metadata, Paths) go through _json_default.
+
+    Writes bytes straight to stdout so orjson output is never decoded to str.
+    """
+    if _orjson is not None:
+        # Non-str keys (int or bool keys in YAML metadata) become strings, as in json.dumps
+        data = _orjson.dumps(
+            obj,
+            default=_json_default,
+            option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS,
+        )
+    else:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default)
+        data = text.encode("utf-8")
+    _write_stdout(data, b"\n")
+
+
+def _write_stdout(*chunks: bytes) -> None:
+    """
+    function_purpose: Write byte chunks to stdout with a single os.writev, without joining them.
+
+    Falls back to sys.stdout.buffer where writev or a real file descriptor is unavailable
+    (Windows, captured or replaced stdout). Short writes are resumed until everything is out.
+    """
+    sys.stdout.flush()
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, ValueError, io.UnsupportedOperation):
+        fd = -1
+    if fd < 0 or not hasattr(os, "writev"):
+        for chunk in chunks:
+            _ = sys.stdout.buffer.write(chunk)
+        sys.stdout.flush()
+        return
+    pending = [memoryview(c) for c in chunks if c]
+    while pending:
+        written = os.writev(fd, pending)
+        while pending and written >= len(pending[0]):
+            written -= len(pending.pop(0))
+        if pending:
+            pending[0] = pending[0][written:]
+
+
+def _emit_iter(records: Iterable[Any]) -> None:
+    """
+    function_purpose: Stream records to stdout as one indented JSON array, record by record.
+
+    Produces the same bytes as _emit(list(records)) without holding the whole list or its
+    serialized form in memory; each record is written as soon as it is produced.
+    """
+    if _orjson is not None:
+
+        def dump(rec: Any) -> bytes:
+            return _orjson.dumps(
+                rec,
+                default=_json_default,
+                option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS,
+            )
+
+    else:
+
+        def dump(rec: Any) -> bytes:
+            text = json.dumps(
+                rec, indent=2, ensure_ascii=False, default=_json_default
+            )
+            return text.encode("utf-8")
+
+    out = sys.stdout.buffer
+    sys.stdout.flush()
+    sep = b"[\n  "
+    for rec in records:
+        _ = out.write(sep + dump(rec).replace(b"\n", b"\n  "))
+        sep = b",\n  "
+    _ = out.write(b"[]\n" if sep == b"[\n  " else b"\n]\n")
+    out.flush()
+
+
+# Flags the CLI dispatches without building the argparse parser, with their operand counts
+_CLI_FAST_FLAGS = {
+    "--list": 0,
+    "--detail": 1,
+    "--search": 1,
+    "--assets": 1,
+    "--read": 2,
+}
+_CLI_MAX_BYTES = 8_388_608
+
+
+def _fast_cli_args(argv: list[str]) -> dict[str, Any] | None:
+    """
+    function_purpose: Parse the common single-flag invocations without argparse.
+
+    Returns the mapping vars(parser.parse_args(argv)) would, or None for anything else
+    (--help, --max-bytes, --flag=value, abbreviations, operands starting with '-'),
+    which is then left to argparse.
+    """
+    if not argv or argv[0] not in _CLI_FAST_FLAGS:
+        return None
+    nargs = _CLI_FAST_FLAGS[argv[0]]
+    operands = argv[1:]
+    if len(operands) != nargs or any(op.startswith("-") for op in operands):
+        return None
+    opts: dict[str, Any] = dict.fromkeys(("detail", "search", "assets", "read"))
+    opts.update(list=False, serve=False, max_bytes=_CLI_MAX_BYTES)
+    opts[argv[0][2:]] = True if nargs == 0 else operands[0] if nargs == 1 else operands
+    return opts
+
+
+@functools.cache
+def _cli_parser() -> argparse.ArgumentParser:
+    """
+    function_purpose: Build the CLI argument parser once and reuse it for repeated cli_main calls.
+    """
+    import argparse
 
     parser = argparse.ArgumentParser(
         prog="skills_mcp.server",
@@ -1898,7 +3231,7 @@ def cli_main() -> None:
     _ = parser.add_argument(
         "--max-bytes",
         type=int,
-        default=8_388_608,
+        default=_CLI_MAX_BYTES,
         help="Maximum bytes to read for assets",
     )
     _ = parser.add_argument(
@@ -1906,61 +3239,53 @@ def cli_main() -> None:
         action="store_true",
         help="Start MCP stdio server (default when no flags used)",
     )
+    return parser
+
+
+def cli_main(argv: list[str] | None = None) -> None:
+    """
+    function_purpose: CLI for inspecting skills without starting the MCP server.
+
+    Usage:
+      python -m skills_mcp.server --list
+      python -m skills_mcp.server --detail <NAME>
+      python -m skills_mcp.server --search "<QUERY>"
+      python -m skills_mcp.server --assets <NAME>
+      python -m skills_mcp.server --read <NAME> <PATH> [--max-bytes N]
+    """
+    logger = configure_logging()
+    skills_dir = _resolve_skills_dir()
+    if argv is None:
+        argv = sys.argv[1:]
 
-    args = parser.parse_args()
+    opts = _fast_cli_args(argv)
+    if opts is None:
+        opts = vars(_cli_parser().parse_args(argv))
 
-    if args.list:
+    if opts["list"]:
         logger.info("Listing skills...")
-        skills = discover_skills(skills_dir, logger=logger)
-        result = [
-            {
-                k: v
-                for k, v in s.items()
-                if k
-                in {
-                    "name",
-                    "description",
-                    "license",
-                    "allowed_tools",
-                    "metadata",
-                    "path",
-                }
-            }
-            for s in skills
-        ]
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        _emit(discover_skill_briefs(skills_dir, logger=logger))
         return
 
-    if args.detail:
-        logger.info("Detail for skill: %s", args.detail)
-        print(
-            json.dumps(get_skill(skills_dir, args.detail), indent=2, ensure_ascii=False)
-        )
+    if opts["detail"]:
+        logger.info("Detail for skill: %s", opts["detail"])
+        _emit(get_skill(skills_dir, opts["detail"]))
         return
 
-    if args.search:
-        logger.info("Search query: %s", args.search)
-        print(
-            json.dumps(
-                search_skills(skills_dir, args.search), indent=2, ensure_ascii=False
-            )
-        )
+    if opts["search"]:
+        logger.info("Search query: %s", opts["search"])
+        _emit_iter(iter_search_skills(skills_dir, opts["search"]))
         return
 
-    if args.assets:
-        logger.info("Listing assets for skill: %s", args.assets)
-        print(
-            json.dumps(
-                list_skill_assets(skills_dir, args.assets), indent=2, ensure_ascii=False
-            )
-        )
+    if opts["assets"]:
+        logger.info("Listing assets for skill: %s", opts["assets"])
+        _emit_iter(list_skill_assets(skills_dir, opts["assets"]))
         return
 
-    if args.read:
-        name, rel_path = args.read
+    if opts["read"]:
+        name, rel_path = opts["read"]
         logger.info("Reading asset: skill=%s path=%s", name, rel_path)
-        payload = read_skill_asset(skills_dir, name, rel_path, args.max_bytes)
-        print(json.dumps(payload, indent=2, ensure_ascii=False))
+        _emit(read_skill_asset(skills_dir, name, rel_path, opts["max_bytes"]))
         return
 
     # Default: start server
@@ -1,18 +1,49 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import datetime
+import json
+import logging
+import threading
 from pathlib import Path
 from typing import Any
 
 import pytest
+import yaml
 
+from skills_mcp import server
 from skills_mcp.server import (
+    _fast_frontmatter_parse,
+    _is_text_data,
+    _parse_frontmatter_and_body,
+    _slugify,
+    discover_skill_briefs,
     discover_skills,
     get_skill,
+    iter_skill_md_paths,
     list_skill_assets,
     read_skill_asset,
+    search_skills,
+    skill_dir_for_name,
 )
 
 
+@pytest.fixture(autouse=True)
+def _isolated_snapshot(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Keep discovery snapshots out of the repository root
+    monkeypatch.setenv("SKILLS_SNAPSHOT_FILE", str(tmp_path / "snapshot.json"))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # cli_main configures file logging, and the tools default to the repository's
+    # skills/ and user-skills/; keep logs and writes inside tmp_path
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "logs" / "skills_mcp_server.log"))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "skills"))
+    monkeypatch.setenv("USER_SKILLS_DIR", str(tmp_path / "user-skills"))
+
+
 def _skills_dir() -> Path:
     # tests/ -> project root is parent, skills under project root
     root = Path(__file__).resolve().parents[1]
@@ -169,3 +200,815 @@ def test_read_skill_asset_returns_text_for_markdown_when_available() -> None:
     # If MIME was known, it should match expectation
     if md_asset.get("mime_type"):
         assert payload["mime_type"] == md_asset["mime_type"]
+
+
+def _write_skill(root: Path, name: str, description: str, body: str = "") -> Path:
+    skill_dir = root / name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    md_path = skill_dir / "SKILL.md"
+    _ = md_path.write_text(
+        f"---\nname: {name}\ndescription: {description}\n---\n{body}\n",
+        encoding="utf-8",
+    )
+    return md_path
+
+
+def test_discover_skills_cache_revalidates_on_change(tmp_path: Path) -> None:
+    md_path = _write_skill(tmp_path, "alpha", "first")
+    _ = _write_skill(tmp_path, "beta", "second")
+
+    first = discover_skills(tmp_path)
+    assert [s["name"] for s in first] == ["alpha", "beta"]
+    # Unchanged tree returns the cached entries
+    assert discover_skills(tmp_path)[0] is first[0]
+
+    _ = md_path.write_text(
+        "---\nname: alpha\ndescription: first, edited\n---\n", encoding="utf-8"
+    )
+    (tmp_path / "beta" / "SKILL.md").unlink()
+
+    second = discover_skills(tmp_path)
+    assert [s["name"] for s in second] == ["alpha"]
+    assert second[0]["description"] == "first, edited"
+
+    # Explicit invalidation re-parses even when nothing changed on disk
+    server._invalidate(tmp_path)
+    assert discover_skills(tmp_path)[0] is not second[0]
+
+
+def test_lookups_survive_concurrent_invalidation(tmp_path: Path) -> None:
+    skill_dir = _write_skill(tmp_path, "alpha", "first").parent
+    _ = (skill_dir / "ref.txt").write_text("ref", encoding="utf-8")
+    # Nested skills resolve through the discovery index rather than the top-level stat
+    _ = _write_skill(tmp_path / "group", "beta", "second")
+    _ = discover_skills(tmp_path)
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def _invalidate_loop() -> None:
+        try:
+            while not stop.is_set():
+                server._invalidate(tmp_path)
+        except BaseException as exc:
+            errors.append(exc)
+
+    worker = threading.Thread(target=_invalidate_loop)
+    worker.start()
+    try:
+        for _ in range(200):
+            briefs = server.discover_skill_briefs(tmp_path)
+            assert [s["name"] for s in briefs] == ["alpha", "beta"]
+            assert server.get_skill(tmp_path, "alpha", include_notes=False)
+            assert server.skill_dir_for_name(tmp_path, "alpha") == skill_dir
+            assert server.skill_dir_for_name(tmp_path, "beta").name == "beta"
+            asset = server.read_skill_asset(tmp_path, "alpha", "ref.txt")
+            assert asset["data"] == "ref"
+    finally:
+        stop.set()
+        worker.join()
+    assert errors == []
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_discover_skills_loads_snapshot_on_cold_start(
+    use_orjson: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if use_orjson and server._orjson is None:
+        pytest.skip("orjson not installed")
+    if not use_orjson:
+        monkeypatch.setattr(server, "_orjson", None)
+    skills_root = tmp_path / "skills"
+    _ = _write_skill(skills_root, "alpha", "first")
+    first = discover_skills(skills_root)
+    assert (tmp_path / "snapshot.json").is_file()
+
+    # Simulate a fresh process: empty in-memory caches and no YAML parsing allowed
+    monkeypatch.setattr(server, "_SKILLS_CACHE", {})
+    monkeypatch.setattr(server, "_DISCOVERY_MANIFEST", {})
+    monkeypatch.setattr(server, "_DISCOVERY_RESULT", {})
+    monkeypatch.setattr(server, "_SNAPSHOT_CHECKED", set())
+
+    def _fail(*_args: Any) -> dict[str, Any]:
+        raise AssertionError("snapshot should have been used")
+
+    monkeypatch.setattr(server, "parse_skill_md", _fail)
+    monkeypatch.setattr(server, "parse_skill_md_header", _fail)
+    assert discover_skills(skills_root) == first
+
+
+def test_discover_skills_reuses_unchanged_snapshot_entries(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    skills_root = tmp_path / "skills"
+    _ = _write_skill(skills_root, "alpha", "first")
+    _ = _write_skill(skills_root, "beta", "second")
+    _ = discover_skills(skills_root)
+
+    # Fresh process after one SKILL.md changed: only that file is parsed again
+    monkeypatch.setattr(server, "_SKILLS_CACHE", {})
+    monkeypatch.setattr(server, "_DISCOVERY_MANIFEST", {})
+    monkeypatch.setattr(server, "_DISCOVERY_RESULT", {})
+    monkeypatch.setattr(server, "_SNAPSHOT_CHECKED", set())
+    _ = _write_skill(skills_root, "beta", "second, edited")
+
+    parsed: list[str] = []
+    real_parse = server.parse_skill_md_header
+
+    def _counting_parse(md_path: Path, skills_dir: Path) -> dict[str, Any]:
+        parsed.append(md_path.parent.name)
+        return real_parse(md_path, skills_dir)
+
+    monkeypatch.setattr(server, "parse_skill_md_header", _counting_parse)
+    skills = discover_skills(skills_root)
+    assert parsed == ["beta"]
+    assert [s["description"] for s in skills] == ["first", "second, edited"]
+
+
+def test_parse_frontmatter_and_body_delimiters() -> None:
+    fm, body = _parse_frontmatter_and_body(
+        '---\nname: a\ndescription: "b\n----"\n---\n# Title\n---\nmore\n'
+    )
+    assert fm == {"name": "a", "description": "b ----"}
+    assert body == "# Title\n---\nmore\n"
+
+    fm, body = _parse_frontmatter_and_body("---\r\nname: a\r\n---  \r\nbody")
+    assert fm == {"name": "a"}
+    assert body == "body"
+
+    assert _parse_frontmatter_and_body("---\n---\n") == ({}, "")
+
+    with pytest.raises(ValueError, match="must begin"):
+        _ = _parse_frontmatter_and_body("name: a\n---\n")
+    with pytest.raises(ValueError, match="must end"):
+        _ = _parse_frontmatter_and_body("---\nname: a\n")
+
+
+def test_search_skills_matches_substrings_across_words(tmp_path: Path) -> None:
+    _ = _write_skill(tmp_path, "pdf-tools", "Handle PDFs and forms", "Fill forms.")
+    _ = _write_skill(tmp_path, "docx", "Word documents", "Tracked changes; redlines")
+
+    def names(query: str) -> list[str]:
+        return [r["name"] for r in search_skills(tmp_path, query)]
+
+    assert names("pdf") == ["pdf-tools"]
+    assert names("ORMS") == ["pdf-tools"]
+    assert names("word doc") == ["docx"]
+    assert names("changes; red") == ["docx"]
+    assert names("forms word") == []
+    assert names(";") == ["docx"]
+    assert names("   ") == []
+
+
+def test_skill_dir_for_name_uses_valid_skills_only(tmp_path: Path) -> None:
+    md_path = _write_skill(tmp_path / "group", "alpha", "first")
+    broken = tmp_path / "broken"
+    broken.mkdir()
+    _ = (broken / "SKILL.md").write_text("no frontmatter\n", encoding="utf-8")
+
+    # Before and after a full discovery of the tree
+    for _attempt in range(2):
+        assert skill_dir_for_name(tmp_path, "alpha") == md_path.parent
+        with pytest.raises(ValueError, match="not found"):
+            _ = skill_dir_for_name(tmp_path, "broken")
+        _ = discover_skills(tmp_path)
+
+
+def test_lookup_before_discovery_parses_only_the_named_skill(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _ = _write_skill(tmp_path, "alpha", "first")
+    _ = _write_skill(tmp_path, "beta", "second")
+    parsed: list[str] = []
+    parse_header = server.parse_skill_md_header
+
+    def _recording(md_path: Path, skills_dir: Path) -> dict[str, Any]:
+        parsed.append(md_path.parent.name)
+        return parse_header(md_path, skills_dir)
+
+    monkeypatch.setattr(server, "parse_skill_md_header", _recording)
+    assert skill_dir_for_name(tmp_path, "beta") == tmp_path / "beta"
+    assert get_skill(tmp_path, "beta", include_notes=False)["description"] == "second"
+    assert parsed == ["beta"]
+
+
+def test_discovery_parses_headers_and_get_skill_loads_body(tmp_path: Path) -> None:
+    _ = _write_skill(tmp_path, "alpha", "first", "# Alpha\n\nFull guidance.")
+
+    assert "body" not in discover_skills(tmp_path)[0]
+    detail = get_skill(tmp_path, "alpha", include_notes=False)
+    assert detail["body"] == "# Alpha\n\nFull guidance.\n"
+    # The cached discovery entry is left untouched
+    assert "body" not in discover_skills(tmp_path)[0]
+
+
+def test_iter_skill_md_paths_follows_symlinks_without_cycles(tmp_path: Path) -> None:
+    outside = tmp_path / "outside"
+    linked = _write_skill(outside, "linked", "symlinked skill")
+    skills_root = tmp_path / "skills"
+    _ = _write_skill(skills_root, "own", "regular skill")
+    (skills_root / "linked").symlink_to(linked.parent, target_is_directory=True)
+    (skills_root / "own" / "loop").symlink_to(skills_root, target_is_directory=True)
+    # Skills do not nest, so this nested SKILL.md is never visited
+    _ = _write_skill(skills_root / "own", "nested", "ignored")
+
+    found = sorted(
+        p.relative_to(skills_root).as_posix() for p in iter_skill_md_paths(skills_root)
+    )
+    assert found == ["linked/SKILL.md", "own/SKILL.md"]
+
+
+def test_is_text_data_sniffs_control_bytes() -> None:
+    assert _is_text_data("héllo\n\tworld\r\n".encode("utf-8"), None)
+    assert _is_text_data(b"\x00\x01", "application/json")
+    assert not _is_text_data(b"\x89PNG\r\n\x1a\n\x00\x00", None)
+    assert not _is_text_data(b"abc\x00def", None)
+    # The window must be valid UTF-8; only a character cut at its edge is tolerated
+    assert not _is_text_data(b"caf\xe9", None)
+    edge = b"a" * (server._SNIFF_BYTES - 1) + "é".encode("utf-8")
+    assert _is_text_data(edge, None)
+    # ...but an incomplete character at the end of the data itself is invalid
+    assert not _is_text_data(edge[: server._SNIFF_BYTES], None)
+    assert _is_text_data(edge[: server._SNIFF_BYTES], None, complete=False)
+
+
+def test_read_skill_asset_truncates_at_max_bytes(tmp_path: Path) -> None:
+    skill_md = _write_skill(tmp_path, "alpha", "first")
+    (skill_md.parent / "data.txt").write_text("abcdefgh", encoding="utf-8")
+
+    cut = read_skill_asset(tmp_path, "alpha", "data.txt", max_bytes=4)
+    assert (cut["data"], cut["truncated"]) == ("abcd", True)
+    exact = read_skill_asset(tmp_path, "alpha", "data.txt", max_bytes=8)
+    assert (exact["data"], exact["truncated"]) == ("abcdefgh", False)
+
+
+def test_read_skill_asset_sniffed_invalid_utf8_is_base64(tmp_path: Path) -> None:
+    skill_dir = _write_skill(tmp_path, "alpha", "first").parent
+    latin1 = b"caf\xe9"
+    late_binary = b"a" * 5120 + b"\xff\xfe\x80"
+    for filename, raw in (("latin1.dat", latin1), ("late.dat", late_binary)):
+        _ = (skill_dir / filename).write_bytes(raw)
+        asset = read_skill_asset(tmp_path, "alpha", filename)
+        assert asset["encoding"] == "base64"
+        assert base64.b64decode(asset["data"]) == raw
+
+    # A declared text type is still returned as text, with replacement characters
+    _ = (skill_dir / "latin1.txt").write_bytes(latin1)
+    declared = read_skill_asset(tmp_path, "alpha", "latin1.txt")
+    assert (declared["encoding"], declared["data"]) == ("text", "caf\ufffd")
+
+    # A declared text file cut inside a multibyte character ends in U+FFFD
+    _ = (skill_dir / "wide.txt").write_bytes("aé".encode("utf-8"))
+    cut = read_skill_asset(tmp_path, "alpha", "wide.txt", max_bytes=2)
+    assert (cut["encoding"], cut["data"], cut["truncated"]) == ("text", "a\ufffd", True)
+
+    # A sniffed read cut inside a multibyte character drops just the partial character
+    _ = (skill_dir / "wide.dat").write_bytes("aé".encode("utf-8"))
+    cut = read_skill_asset(tmp_path, "alpha", "wide.dat", max_bytes=2)
+    assert (cut["encoding"], cut["data"], cut["truncated"]) == ("text", "a", True)
+
+
+def test_read_skill_asset_reads_past_stale_st_size(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    skill_md = _write_skill(tmp_path, "alpha", "first")
+    (skill_md.parent / "data.txt").write_text("abcdefgh", encoding="utf-8")
+    real_fstat = server.os.fstat
+
+    def _zero_size_fstat(fd: int) -> Any:
+        # procfs-style files report st_size 0 but still have content
+        st = real_fstat(fd)
+        return server.os.stat_result((*st[:6], 0, *st[7:]))
+
+    monkeypatch.setattr(server.os, "fstat", _zero_size_fstat)
+    full = read_skill_asset(tmp_path, "alpha", "data.txt", max_bytes=100)
+    assert (full["data"], full["truncated"]) == ("abcdefgh", False)
+    cut = read_skill_asset(tmp_path, "alpha", "data.txt", max_bytes=4)
+    assert (cut["data"], cut["truncated"]) == ("abcd", True)
+
+
+def test_discover_skill_briefs_omit_body_and_follow_changes(tmp_path: Path) -> None:
+    _ = _write_skill(tmp_path, "alpha", "first")
+
+    briefs = discover_skill_briefs(tmp_path)
+    assert [b["name"] for b in briefs] == ["alpha"]
+    assert "body" not in briefs[0]
+    assert discover_skill_briefs(tmp_path)[0] is briefs[0]
+
+    _ = _write_skill(tmp_path, "beta", "second")
+    assert [b["name"] for b in discover_skill_briefs(tmp_path)] == ["alpha", "beta"]
+
+
+def test_read_skill_asset_rejects_paths_outside_skill(tmp_path: Path) -> None:
+    _ = _write_skill(tmp_path, "alpha", "first")
+    sibling = _write_skill(tmp_path, "alpha-two", "second")
+    (sibling.parent / "secret.txt").write_text("nope", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="within the skill directory"):
+        _ = read_skill_asset(tmp_path, "alpha", "../alpha-two/secret.txt")
+
+
+def test_fast_frontmatter_parse_agrees_with_yaml() -> None:
+    accepted = [
+        "name: pdf\ndescription: Work with pdf files, including forms.\nlicense: MIT\n",
+        "name: a\ndescription: 'quoted: value'\nallowed-tools: [Read, \"Write\"]\n",
+        "name: a\nallowed-tools:\n  - Read\n\n  - Bash\n",
+        "name: http://example.com/a:b\n",
+    ]
+    declined = [
+        "name: a\nmetadata:\n  author: x\n",
+        "name: a\ndescription: >\n  folded text\n",
+        "name: a\ndescription: x # comment\n",
+        "name: a\nallowed-tools:\n",
+        "name: 1.0\n",
+        "name: yes\n",
+        "name: a\nname: b\n",
+        "name: a\n  continued\n",
+    ]
+    for text in accepted:
+        assert _fast_frontmatter_parse(text) == yaml.safe_load(text), text
+    for text in declined:
+        assert _fast_frontmatter_parse(text) is None, text
+
+
+def test_list_skill_assets_skips_heavy_dirs_and_caps_entries(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("USER_SKILLS_DIR", str(tmp_path / "user-skills"))
+    skill_dir = _write_skill(tmp_path / "skills", "alpha", "first").parent
+    for i in range(3):
+        (skill_dir / f"f{i}.txt").write_text("x", encoding="utf-8")
+    (skill_dir / "node_modules").mkdir()
+    (skill_dir / "node_modules" / "dep.js").write_text("x", encoding="utf-8")
+    (skill_dir / "_notes").mkdir()
+    (skill_dir / "_notes" / "note.md").write_text("x", encoding="utf-8")
+
+    assets = list_skill_assets(tmp_path / "skills", "alpha")
+    assert [a["path"] for a in assets] == ["f0.txt", "f1.txt", "f2.txt"]
+    capped = list_skill_assets(tmp_path / "skills", "alpha", max_assets=2)
+    assert len(capped) == 3
+    assert capped[-1] == {
+        "path": "...",
+        "size": None,
+        "mime_type": None,
+        "truncated": True,
+    }
+
+
+def test_slugify_collapses_separators_and_drops_punctuation() -> None:
+    assert _slugify("  Café, au  lait! ") == "café-au-lait"
+    assert _slugify("a__b--c") == "a-b-c"
+    assert _slugify("!!!") == "note"
+
+
+def test_read_skill_asset_reports_missing_and_non_regular_files(tmp_path: Path) -> None:
+    skill_dir = _write_skill(tmp_path, "alpha", "first").parent
+    (skill_dir / "sub").mkdir()
+
+    for rel_path in ("missing.txt", "sub", "SKILL.md/x"):
+        with pytest.raises(ValueError, match="file not found"):
+            _ = read_skill_asset(tmp_path, "alpha", rel_path)
+
+
+def test_git_sync_skips_when_recently_synced(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / ".git").mkdir()
+    server._sync_stamp(tmp_path).touch()
+    calls: list[list[str]] = []
+    monkeypatch.setattr(server, "_git_run", lambda args, **_kw: calls.append(args))
+
+    server._git_sync(tmp_path, logging.getLogger("test"))
+    assert calls == []
+
+
+def test_read_skill_asset_rejects_symlinks_leaving_the_skill(tmp_path: Path) -> None:
+    skill_dir = _write_skill(tmp_path / "skills", "alpha", "first").parent
+    secret = tmp_path / "secret.txt"
+    secret.write_text("nope", encoding="utf-8")
+    (skill_dir / "link.txt").symlink_to(secret)
+
+    with pytest.raises(ValueError, match="within the skill directory"):
+        _ = read_skill_asset(tmp_path / "skills", "alpha", "link.txt")
+    with pytest.raises(ValueError, match="within the skill directory"):
+        _ = read_skill_asset(tmp_path / "skills", "alpha", str(secret))
+
+
+def test_read_skill_asset_base64_encodes_binary(tmp_path: Path) -> None:
+    skill_dir = _write_skill(tmp_path, "alpha", "first").parent
+    (skill_dir / "blob.bin").write_bytes(b"\x00\x01\x02\xff" * 3)
+
+    result = read_skill_asset(tmp_path, "alpha", "blob.bin")
+    assert result["encoding"] == "base64"
+    assert base64.b64decode(result["data"]) == b"\x00\x01\x02\xff" * 3
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_emit_writes_utf8_json(
+    use_orjson: bool,
+    monkeypatch: pytest.MonkeyPatch,
+    capsysbinary: pytest.CaptureFixture[bytes],
+) -> None:
+    if use_orjson and server._orjson is None:
+        pytest.skip("orjson not installed")
+    if not use_orjson:
+        monkeypatch.setattr(server, "_orjson", None)
+
+    server._emit([{"name": "café"}])
+    out = capsysbinary.readouterr().out
+    assert out.endswith(b"\n")
+    assert json.loads(out) == [{"name": "café"}]
+
+    # YAML dates in metadata and Paths are written as strings, identically either way
+    server._emit({"created": datetime.date(2024, 1, 2), "path": Path("a/b")})
+    assert json.loads(capsysbinary.readouterr().out) == {
+        "created": "2024-01-02",
+        "path": "a/b",
+    }
+
+    # YAML metadata may have int or bool keys; both become strings like json.dumps does
+    metadata = {"metadata": {1: "x", False: "y"}}
+    server._emit(metadata)
+    expected = capsysbinary.readouterr().out
+    assert json.loads(expected) == {"metadata": {"1": "x", "false": "y"}}
+    server._emit_iter(iter([metadata]))
+    assert json.loads(capsysbinary.readouterr().out) == [json.loads(expected)]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize(
+    "records", [[], [{"name": "café", "tags": ["a", "b"]}, {"name": "x", "meta": {}}]]
+)
+def test_emit_iter_matches_emit(
+    use_orjson: bool,
+    records: list[dict[str, Any]],
+    monkeypatch: pytest.MonkeyPatch,
+    capsysbinary: pytest.CaptureFixture[bytes],
+) -> None:
+    if use_orjson and server._orjson is None:
+        pytest.skip("orjson not installed")
+    if not use_orjson:
+        monkeypatch.setattr(server, "_orjson", None)
+
+    server._emit(records)
+    expected = capsysbinary.readouterr().out
+    server._emit_iter(iter(records))
+    assert capsysbinary.readouterr().out == expected
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--list"],
+        ["--detail", "pdf"],
+        ["--search", "pdf form"],
+        ["--assets", "pdf"],
+        ["--read", "pdf", "forms.md"],
+    ],
+)
+def test_fast_cli_args_match_argparse(
+    argv: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fast = server._fast_cli_args(argv)
+    assert fast is not None
+
+    seen: dict[str, Any] = {}
+    monkeypatch.setattr(server, "_fast_cli_args", lambda _argv: None)
+    monkeypatch.setattr(server, "configure_logging", lambda: logging.getLogger("t"))
+    import argparse
+
+    real_parse = argparse.ArgumentParser.parse_args
+
+    def _capture(self: argparse.ArgumentParser, args: Any = None) -> Any:
+        ns = real_parse(self, args)
+        seen["opts"] = vars(ns)
+        raise SystemExit(0)
+
+    monkeypatch.setattr(argparse.ArgumentParser, "parse_args", _capture)
+    with pytest.raises(SystemExit):
+        server.cli_main(argv)
+    assert seen["opts"] == fast
+
+
+@pytest.mark.parametrize(
+    "argv", [[], ["--help"], ["--detail"], ["--detail=pdf"], ["--search", "-x"]]
+)
+def test_fast_cli_args_defers_to_argparse(argv: list[str]) -> None:
+    assert server._fast_cli_args(argv) is None
+
+
+def test_write_stdout_resumes_short_writes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if not hasattr(server.os, "writev"):
+        pytest.skip("os.writev not available")
+    out_path = tmp_path / "out.bin"
+
+    def _short_writev(fd: int, buffers: list[memoryview]) -> int:
+        # Emulate a pipe that accepts at most 3 bytes per call
+        return server.os.write(fd, b"".join(buffers)[:3])
+
+    monkeypatch.setattr(server.os, "writev", _short_writev)
+    with open(out_path, "w", encoding="utf-8") as fh:
+        monkeypatch.setattr(server.sys, "stdout", fh)
+        server._write_stdout(b"hello ", b"", b"world", b"\n")
+    assert out_path.read_bytes() == b"hello world\n"
+
+
+def test_skill_create_frontmatter_round_trips(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_dir = tmp_path / "user-skills"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(user_dir))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "bundled"))
+    result = server.skill_create(
+        "gamma",
+        'Use for "quoted": things',
+        allowed_tools=["Read", "Bash"],
+        metadata={"owner": "it's me", "tags": ["a", "b"]},
+    )
+    assert result["created"] is True
+
+    skill = get_skill(user_dir, "gamma")
+    assert skill["description"] == 'Use for "quoted": things'
+    assert skill["allowed_tools"] == ["Read", "Bash"]
+    assert skill["metadata"] == {"owner": "it's me", "tags": ["a", "b"]}
+
+    # Metadata the safe dumper cannot represent is reported and creates nothing
+    bad = server.skill_create("delta", "desc", metadata={"obj": object()})
+    assert bad["created"] is False
+    assert bad["message"].startswith("Invalid frontmatter")
+    assert not (user_dir / "delta").exists()
+
+
+def test_skill_add_asset_rejects_symlink_to_sibling_skill(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_dir = tmp_path / "user-skills"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(user_dir))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "bundled"))
+    _ = _write_skill(user_dir, "alpha", "first")
+    sibling = user_dir / "alpha-other"
+    sibling.mkdir()
+    (user_dir / "alpha" / "link").symlink_to(sibling, target_is_directory=True)
+
+    escaped = server.skill_add_asset("alpha", "link/x.txt", "nope")
+    assert escaped["written"] is False
+    assert not (sibling / "x.txt").exists()
+
+    ok = server.skill_add_asset("alpha", "docs/./x.txt", "hello")
+    assert (ok["written"], ok["path"], ok["size"]) == (True, "docs/x.txt", 5)
+
+    # size is the UTF-8 byte count, not the character count
+    wide = server.skill_add_asset("alpha", "docs/wide.txt", "héllo\n")
+    assert wide["size"] == (user_dir / "alpha" / "docs" / "wide.txt").stat().st_size == 7
+
+
+def test_load_skill_body_is_memoized_until_file_changes(tmp_path: Path) -> None:
+    md_path = _write_skill(tmp_path, "alpha", "first", body="one")
+    server._load_body_cached.cache_clear()
+    assert server.load_skill_body(md_path) == "one\n"
+    assert server.load_skill_body(md_path) == "one\n"
+    assert server._load_body_cached.cache_info().hits == 1
+
+    _ = _write_skill(tmp_path, "alpha", "first", body="two, longer")
+    assert server.load_skill_body(md_path) == "two, longer\n"
+
+
+def test_skill_dir_for_name_checks_top_level_dir_without_walking(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _ = _write_skill(tmp_path, "alpha", "first")
+    nested = _write_skill(tmp_path / "group", "beta", "second")
+    _ = discover_skills(tmp_path)
+    real_walk = server._walk_skill_mds
+
+    def _no_walk(_skills_dir: Path) -> Any:
+        raise AssertionError("top-level skill should resolve without a walk")
+
+    monkeypatch.setattr(server, "_walk_skill_mds", _no_walk)
+    assert skill_dir_for_name(tmp_path, "alpha") == tmp_path / "alpha"
+    with pytest.raises(AssertionError):
+        # Nested layouts still go through the discovery index
+        _ = skill_dir_for_name(tmp_path, "beta")
+    monkeypatch.setattr(server, "_walk_skill_mds", real_walk)
+    assert skill_dir_for_name(tmp_path, "beta") == nested.parent
+    with pytest.raises(ValueError, match="not found"):
+        _ = skill_dir_for_name(tmp_path, "..")
+
+
+@pytest.mark.parametrize("warm", [False, True])
+@pytest.mark.parametrize("top_valid", [True, False])
+def test_duplicate_names_resolve_to_the_same_skill(
+    warm: bool, top_valid: bool, tmp_path: Path
+) -> None:
+    # "a/alpha" sorts before "alpha", but the top-level directory takes precedence
+    top = _write_skill(tmp_path, "alpha", "top").parent
+    if not top_valid:
+        _ = (top / "SKILL.md").write_text("no frontmatter\n", encoding="utf-8")
+    nested = _write_skill(tmp_path / "a", "alpha", "nested").parent
+    if warm:
+        _ = discover_skills(tmp_path)
+
+    expected_dir, expected_desc = (top, "top") if top_valid else (nested, "nested")
+    assert skill_dir_for_name(tmp_path, "alpha") == expected_dir
+    skill = get_skill(tmp_path, "alpha", include_notes=False)
+    assert skill["description"] == expected_desc
+
+
+@pytest.mark.parametrize("use_pybase64", [True, False])
+def test_skill_add_asset_decodes_base64(
+    use_pybase64: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if use_pybase64 and server._pybase64 is None:
+        pytest.skip("pybase64 not installed")
+    if not use_pybase64:
+        monkeypatch.setattr(server, "_pybase64", None)
+    user_dir = tmp_path / "user-skills"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(user_dir))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "bundled"))
+    skill_md = _write_skill(user_dir, "alpha", "first")
+    payload = bytes(range(256)) * 4
+    # Line-wrapped base64 (as produced by encodebytes) is accepted
+    encoded = base64.encodebytes(payload).decode("ascii")
+
+    result = server.skill_add_asset("alpha", "bin/blob.bin", encoded, "base64")
+    assert (result["written"], result["size"]) == (True, len(payload))
+    assert (skill_md.parent / "bin" / "blob.bin").read_bytes() == payload
+
+    # In-process bulk callers may pass the base64 payload as bytes
+    results = server.skill_add_assets(
+        "alpha",
+        [
+            {"path": "b.bin", "content": encoded.encode("ascii"), "encoding": "base64"},
+            {"path": "t.txt", "content": b"not text"},
+            "not-a-dict",
+        ],
+    )
+    assert [r["written"] for r in results] == [True, False, False]
+    assert (skill_md.parent / "b.bin").read_bytes() == payload
+
+
+@pytest.mark.parametrize("wrapped", [False, True])
+def test_write_b64_file_streams_in_slices(
+    wrapped: bool, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "_B64_CHUNK", 8)
+    payload = bytes(range(256)) * 3
+    encoded = (base64.encodebytes if wrapped else base64.b64encode)(payload)
+    target = tmp_path / "out.bin"
+
+    for content in (encoded, encoded.decode("ascii")):
+        assert server._write_b64_file(target, content) == len(payload)
+        assert target.read_bytes() == payload
+
+    # Rejected by both the sliced and the lenient decode: target keeps its bytes
+    bad = b"A" * 17 + b"=" * 3
+    with pytest.raises(binascii.Error):
+        _ = server._write_b64_file(target, bad)
+    assert target.read_bytes() == payload
+    assert [p.name for p in tmp_path.iterdir()] == ["out.bin"]
+
+
+def test_skill_add_asset_bad_base64_keeps_existing_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_dir = tmp_path / "user-skills"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(user_dir))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "bundled"))
+    skill_dir = _write_skill(user_dir, "alpha", "first").parent
+    keep = skill_dir / "keep.bin"
+    _ = keep.write_bytes(b"precious")
+    before = sorted(p.name for p in skill_dir.iterdir())
+
+    result = server.skill_add_asset(
+        "alpha", "keep.bin", "abc", "base64", overwrite=True
+    )
+    assert result["written"] is False
+    assert result["message"].startswith("Write failed")
+    assert keep.read_bytes() == b"precious"
+
+    # A new path is not left behind as an empty file, and no temporary file remains
+    result = server.skill_add_asset("alpha", "new.bin", "abc", "base64")
+    assert result["written"] is False
+    assert sorted(p.name for p in skill_dir.iterdir()) == before
+
+
+def test_skill_add_assets_creates_each_parent_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_dir = tmp_path / "user-skills"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(user_dir))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "bundled"))
+    _ = _write_skill(user_dir, "alpha", "first")
+    made: list[Path] = []
+    real_mkdir = Path.mkdir
+
+    def _recording_mkdir(self: Path, *args: Any, **kwargs: Any) -> None:
+        made.append(self)
+        real_mkdir(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "mkdir", _recording_mkdir)
+    assets = [{"path": f"docs/{i}.md", "content": str(i)} for i in range(5)]
+    assets.append({"path": "x.md", "content": ""})
+    results = server.skill_add_assets("alpha", assets)
+    assert all(r["written"] for r in results)
+    assert sorted(p.name for p in made) == ["alpha", "docs"]
+
+
+def test_skill_add_assets_parallel_batch_keeps_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    user_dir = tmp_path / "user-skills"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(user_dir))
+    monkeypatch.setenv("SKILLS_DIR", str(tmp_path / "bundled"))
+    skill_md = _write_skill(user_dir, "alpha", "first")
+    assets: list[Any] = [
+        {"path": f"d{i % 3}/{i}.txt", "content": str(i)} for i in range(8)
+    ]
+    assets.insert(3, {"content": "no path"})
+    results = server.skill_add_assets("alpha", assets)
+    assert [r["path"] for r in results] == [
+        *(f"d{i % 3}/{i}.txt" for i in range(3)),
+        "",
+        *(f"d{i % 3}/{i}.txt" for i in range(3, 8)),
+    ]
+    assert (skill_md.parent / "d1" / "4.txt").read_text() == "4"
+
+    # A batch naming the same path twice is written in request order
+    dup = [{"path": f"e/{i}.txt", "content": str(i)} for i in range(4)]
+    dup.append({"path": "./e/0.txt", "content": "again"})
+    results = server.skill_add_assets("alpha", dup)
+    assert [r["written"] for r in results] == [True] * 4 + [False]
+    assert (skill_md.parent / "e" / "0.txt").read_text() == "0"
+
+
+@pytest.mark.parametrize(
+    "fm_text",
+    [
+        'title: "Fix: tables"\ncreated_at: 20250101T120000+0100\nkind: note',
+        "title: plain words\ncreated_at: 20250101T120000Z\nkind: note",
+        "title: yes\nkind: note",
+        "title: 2024-01-01\nkind: note",
+        "kind: 123",
+        'title: "esc \\" quote"',
+        "title: [a, b]",
+        "author: me",
+    ],
+)
+def test_fast_note_frontmatter_agrees_with_yaml(fm_text: str) -> None:
+    fast = server._fast_note_frontmatter(fm_text.splitlines())
+    if fast is not None:
+        assert fast == yaml.safe_load(fm_text)
+
+
+def test_note_meta_reads_store_note_output(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bundled = tmp_path / "bundled"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(tmp_path / "user-skills"))
+    monkeypatch.setenv("SKILLS_DIR", str(bundled))
+    _ = _write_skill(bundled, "alpha", "first")
+    stored = server.skill_store_note("alpha", "Fix: tables", "body")
+    assert stored["created"] is True
+
+    [note] = server.skill_list_notes("alpha")
+    assert note["path"] == stored["path"]
+    assert note["size"] == (bundled / "alpha" / stored["path"]).stat().st_size
+    assert (note["title"], note["kind"]) == ("Fix: tables", "note")
+    assert note["created_at"] is not None
+
+
+def test_skill_store_note_same_second_gets_suffix(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bundled = tmp_path / "bundled"
+    monkeypatch.setenv("USER_SKILLS_DIR", str(tmp_path / "user-skills"))
+    monkeypatch.setenv("SKILLS_DIR", str(bundled))
+    _ = _write_skill(bundled, "alpha", "first")
+    monkeypatch.setattr(server, "_file_timestamp", lambda: "20250101T120000Z")
+    first = server.skill_store_note("alpha", "Same", "one")
+    second = server.skill_store_note("alpha", "Same", "two")
+    assert second["path"] == first["path"].removesuffix(".md") + "-1.md"
+    text = (bundled / "alpha" / second["path"]).read_text()
+    assert text == (
+        '---\ntitle: "Same"\ncreated_at: 20250101T120000Z\nkind: note\n---\ntwo\n'
+    )
+
+
+def test_note_meta_reads_only_the_head(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "_NOTE_HEAD_BYTES", 32)
+    short = tmp_path / "short.md"
+    # Body beyond the head is never decoded, so invalid UTF-8 there does not matter
+    _ = short.write_bytes(b"---\ntitle: a\nkind: note\n---\n" + b"\xff" * 100)
+    assert server._note_meta(short) == ("a", None, "note")
+
+    long_fm = tmp_path / "long.md"
+    title = "é" * 40
+    _ = long_fm.write_text(f"---\ntitle: {title}\n---\nbody\n", encoding="utf-8")
+    assert server._note_meta(long_fm) == (title, None, None)
+
+    no_fm = tmp_path / "plain.md"
+    _ = no_fm.write_text("just text\n" * 20, encoding="utf-8")
+    assert server._note_meta(no_fm) == (None, None, None)
@@ -277,12 +277,16 @@ def repo_root() -> Path:
 
 
 @pytest.fixture
-def mcp_client(repo_root: Path) -> MCPStdioClient:
+def mcp_client(
+    repo_root: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> MCPStdioClient:
     """
     Create and start an MCP stdio client connected to the server.
 
     Yields the client and ensures cleanup on teardown.
     """
+    # The server inherits this environment; keep its log file out of the repository
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "skills_mcp_server.log"))
     # Use the installed package entry point
     client = MCPStdioClient(
         command=[sys.executable, "-m", "skills_mcp.server"],